@@ -0,0 +1,590 @@
+"""
+路线平纵横计算（纯 NumPy 实现，可替代 SmartRoadBridge.Alignment）
+
+EI 数据格式及计算方法与 SmartRoadBridge.Alignment.dll 一致（由其 PQX、SQX、DMX、CG 类整理），
+各段文本均按行解析，空行及以 // 开头的行忽略：
+
+ICD（平曲线，积木法线元），字段以逗号分隔：
+    第 1 行：起点桩号
+    第 2 行：起点 X, 起点 Y, 起点方位角（rad，由 X 轴转向 Y 轴为正）
+    其余各行按首字段区分线元类型：
+        1, 长度                       直线
+        2, 半径, 长度, 转向           圆曲线
+        3, A, 半径, 转向              缓和曲线，由直线至半径（ZH-HY）
+        4, A, 半径, 转向              缓和曲线，由半径至直线（YH-HZ）
+        5, A, 起点半径, 终点半径, 转向  缓和曲线，由大半径至小半径
+        6, A, 起点半径, 终点半径, 转向  缓和曲线，由小半径至大半径
+        转向 -1 为左转，其余为右转；缓和曲线长度为 |A²/起点半径 - A²/终点半径|
+    恰有 3 个字段且第 3 个字段为 0 的行为结束行，其后各行不再读取
+SQX（竖曲线），字段以空白分隔：变坡点桩号 高程 [竖曲线半径]，省略半径时取 -1（无竖曲线）
+DMX（地面线），字段以空白分隔：桩号 地面高程
+CG（超高），字段以空白分隔：
+    第 1 行：类型 dtl dtr isSlop jd1 axi jd2，仅支持 axi 为 0、jd2 为 2
+    其余各行：桩号 左侧横坡 右侧横坡，或 桩号 横坡（左右相同）
+
+坐标顺序与 .NET GetCoord 相同，为 [Y, X]（即 CAD 中的 x, y），方位角由 X 轴转向 Y 轴为正。
+缓和曲线坐标采用与 .NET 相同的级数展开（非精确积分），以便两者结果一致。
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+# .NET double.MaxValue，缓和曲线一端半径无穷大
+_MAX_R = np.finfo(float).max
+
+# GetDir 取点间距（m）
+_DET = 1e-5
+
+# 缓和曲线级数展开各项：(符号, 起点曲率次数, 曲率变化率次数, 分母, 长度次数)
+_ALONG = ((-1, 2, 0, 6, 3), (-1, 1, 1, 4, 4), (-1, 0, 2, 10, 5), (1, 4, 0, 120, 5), (1, 3, 1, 36, 6),
+          (1, 2, 2, 28, 7), (1, 1, 3, 48, 8), (1, 0, 4, 216, 9))
+_LATERAL = ((1, 1, 0, 2, 2), (1, 0, 1, 3, 3), (-1, 3, 0, 24, 4), (-1, 2, 1, 10, 5), (-1, 1, 2, 12, 6),
+            (1, 5, 0, 720, 6), (-1, 0, 3, 42, 7), (1, 4, 1, 168, 7), (1, 3, 2, 96, 8), (1, 2, 3, 108, 9))
+
+
+def _lines(text):
+    """
+    文本或字符串序列按行拆分，去掉行首尾空白
+    :param text: 字符串（\\r\\n 或 \\n 分隔）或字符串序列（如 .NET String[]）
+    :return: 各行字符串（保留空行与注释行，以便按行号解析）
+    """
+    if text is None:
+        return []
+    if isinstance(text, str):
+        text = text.splitlines()
+    return [str(line).strip() for line in text]
+
+
+def _rows(text):
+    """去掉空行和注释行，各行按空白拆分为字段"""
+    return [line.split() for line in _lines(text) if line and not line.startswith('//')]
+
+
+def parse_table(text, columns, default=0.0):
+    """
+    解析数值表（SQX, DMX）
+    :param text: 文本
+    :param columns: 列数，不足的列取 default
+    :param default: 缺省值
+    :return: (行数, columns) 数组，按首列（桩号）升序排列
+    """
+    rows = [[float(i) for i in row[:columns]] + [default] * (columns - len(row)) for row in _rows(text)]
+    table = np.array(rows, dtype=float).reshape(-1, columns)
+    return table[np.argsort(table[:, 0], kind='stable')]
+
+
+def parse_sqx(text):
+    """
+    解析竖曲线，恰有 3 个字段时第 3 个字段为竖曲线半径，否则半径取 -1
+    :param text: SQX 文本
+    :return: (变坡点数, 3) 数组：桩号, 高程, 半径
+    """
+    rows = [[float(row[0]), float(row[1]), float(row[2]) if len(row) == 3 else -1.0] for row in _rows(text)]
+    table = np.array(rows, dtype=float).reshape(-1, 3)
+    return table[np.argsort(table[:, 0], kind='stable')]
+
+
+def parse_cg(text):
+    """
+    解析超高，首行为类型行
+    :param text: CG 文本
+    :return: (行数, 3) 数组：桩号, 左侧横坡, 右侧横坡
+    """
+    rows = _rows(text)
+    if not rows:
+        return np.zeros((0, 3))
+    head = rows[0]
+    if len(head) < 7:
+        raise ValueError(f'CG 首行应为 类型 dtl dtr isSlop jd1 axi jd2 共 7 个字段，实为 {len(head)} 个：{head}')
+    if float(head[5]) != 0 or int(head[6]) != 2:
+        raise ValueError(f'超高数据类型超过已知：{head}')
+    table = np.array([[float(row[0]), float(row[1]), float(row[2] if len(row) == 3 else row[1])]
+                      for row in rows[1:]], dtype=float).reshape(-1, 3)
+    return table[np.argsort(table[:, 0], kind='stable')]
+
+
+def parse_icd(text):
+    """
+    解析平曲线线元
+    :param text: ICD 文本
+    :return: 起点桩号, 起点坐标 [Y, X], 起点方位角（rad）, 各线元长度, 起点曲率, 终点曲率（右转为正）
+    """
+    lines = _lines(text)
+    k0, p0, a0 = None, None, None
+    length, k_start, k_end = [], [], []
+    for i, line in enumerate(lines):
+        if not line:
+            continue
+        if i == 0:
+            k0 = float(line)
+            continue
+        fields = line.split(',')
+        if i == 1:
+            x0, y0, a0 = [float(j) for j in fields[:3]]
+            p0 = (y0, x0)
+            continue
+        if line.startswith('//'):
+            continue
+        if len(fields) == 3 and int(fields[2]) == 0:
+            break
+        try:
+            kind = int(fields[0])
+        except ValueError:
+            raise ValueError(f'ICD 第 {i + 1} 行线元类型无法识别：{line}') from None
+
+        if kind == 1:
+            length.append(float(fields[1]))
+            k_start.append(0.0)
+            k_end.append(0.0)
+            continue
+        if kind == 2:
+            r, l, side = float(fields[1]), float(fields[2]), fields[3]
+            r0 = r1 = r
+        elif kind in (3, 4):
+            a, r, side = float(fields[1]), float(fields[2]), fields[3]
+            r0, r1 = (_MAX_R, r) if kind == 3 else (r, _MAX_R)
+        elif kind in (5, 6):
+            a, r0, r1, side = float(fields[1]), float(fields[2]), float(fields[3]), fields[4]
+        else:
+            raise ValueError(f'ICD 第 {i + 1} 行未知线元类型：{kind}')
+        if kind != 2:
+            l = abs(a * a / r0 - a * a / r1)
+        side = -1.0 if int(side) == -1 else 1.0
+        length.append(l)
+        k_start.append(side / r0)
+        k_end.append(side / r1)
+    if p0 is None:
+        raise ValueError('ICD 数据不完整，应至少含起点桩号及起点坐标两行')
+    return k0, p0, a0, np.array(length), np.array(k_start), np.array(k_end)
+
+
+def _element_xy(theta0, k0, k1, length, s):
+    """
+    线元内坐标增量，直线与圆曲线为闭合解，缓和曲线为 .NET 所用级数展开
+    :param theta0: 线元起点方位角
+    :param k0: 线元起点曲率（右转为正）
+    :param k1: 线元终点曲率（右转为正）
+    :param length: 线元长度
+    :param s: 距线元起点的长度
+    :return: 坐标增量 dY, dX（与 GetCoord 顺序相同）
+    """
+    theta0, k0, k1, length, s = np.broadcast_arrays(*[np.asarray(i, dtype=float) for i in (theta0, k0, k1, length,
+                                                                                              s)])
+    side = np.where(k0 + k1 < 0, -1.0, 1.0)
+    c0, c1 = np.abs(k0), np.abs(k1)
+
+    # 局部坐标：along 沿起点切线，lateral 垂直切线、偏向转向一侧
+    arc = (c0 == c1) & (c0 != 0)
+    c = np.where(arc, c0, 1)
+    along = np.where(arc, np.sin(c * s) / c, s)
+    lateral = np.where(arc, (1 - np.cos(c * s)) / c, 0)
+
+    spiral = c0 != c1
+    if np.any(spiral):
+        ss, cc0 = s[spiral], c0[spiral]
+        dc = (c1[spiral] - cc0) / (2 * length[spiral])
+        along[spiral] = ss + sum(sign * cc0 ** i * dc ** j / k * ss ** m for sign, i, j, k, m in _ALONG)
+        lateral[spiral] = sum(sign * cc0 ** i * dc ** j / k * ss ** m for sign, i, j, k, m in _LATERAL)
+
+    lateral = lateral * side
+    return (lateral * np.cos(theta0) + along * np.sin(theta0),
+            along * np.cos(theta0) - lateral * np.sin(theta0))
+
+
+class Alignment:
+    def __init__(self, name, icd, sqx=None, dmx=None, cg=None, step=1.0):
+        """
+        路线，参数与 SmartRoadBridge.Alignment.Align 相同
+        :param name: 路线名称
+        :param icd: 平曲线文本
+        :param sqx: 竖曲线文本
+        :param dmx: 地面线文本
+        :param cg: 超高文本
+        :param step: 加密采样步长（m），用于由坐标反算桩号
+        """
+        self.name = name
+        self.step = step
+        k0, p0, a0, self.length, self.k_start, self.k_end = parse_icd(icd)
+
+        # 各线元起点桩号、坐标（x, y 与 GetCoord 顺序相同）与方位角
+        n = len(self.length)
+        self.sta = k0 + np.r_[0, np.cumsum(self.length)]
+        self.x = np.full(n + 1, p0[0])
+        self.y = np.full(n + 1, p0[1])
+        self.theta = np.full(n + 1, a0)
+        for i in range(n):
+            dx, dy = _element_xy(self.theta[i], self.k_start[i], self.k_end[i], self.length[i], self.length[i])
+            self.x[i + 1] = self.x[i] + dx
+            self.y[i + 1] = self.y[i] + dy
+            self.theta[i + 1] = self.theta[i] + (self.k_start[i] + self.k_end[i]) / 2 * self.length[i]
+
+        self.sqx = parse_sqx(sqx)
+        self.dmx = parse_table(dmx, 2)
+        self.cg = parse_cg(cg)
+        self._samples = None
+        self._tree = None
+
+    _arrays = ('sta', 'x', 'y', 'theta', 'length', 'k_start', 'k_end', 'sqx', 'dmx', 'cg')
+
+    def save(self, path):
+        """
+        保存解析及加密采样结果为 .npz 文件
+        :param path: 文件路径
+        """
+        stations, points = self.samples
+        np.savez(path, name=self.name, step=self.step, sample_sta=stations, sample_xy=points,
+                 **{i: getattr(self, i) for i in self._arrays})
+
+    @classmethod
+    def load(cls, path):
+        """
+        读取 save 保存的 .npz 文件，不再解析 EI 文本
+        :param path: 文件路径
+        :return: Alignment
+        """
+        align = cls.__new__(cls)
+        with np.load(path) as data:
+            for i in cls._arrays:
+                setattr(align, i, data[i])
+            align.name = str(data['name'])
+            align.step = float(data['step'])
+            align._samples = data['sample_sta'], data['sample_xy']
+        align._tree = None
+        return align
+
+    @property
+    def start(self):
+        """起点桩号"""
+        return self.sta[0]
+
+    @property
+    def end(self):
+        """终点桩号"""
+        return self.sta[-1]
+
+    @property
+    def curPQX(self):
+        """与 .NET Align.curPQX 接口一致的平曲线对象"""
+        return PQX(self)
+
+    def _locate(self, stations):
+        """桩号所在线元序号及线元内长度，桩号限制在路线范围内"""
+        stations = np.clip(np.asarray(stations, dtype=float), self.start, self.end)
+        idx = np.clip(np.searchsorted(self.sta, stations, side='right') - 1, 0, len(self.length) - 1)
+        return idx, stations - self.sta[idx]
+
+    def curvature(self, stations):
+        """
+        曲率（1/m），右转为正
+        :param stations: 桩号数组
+        """
+        idx, s = self._locate(stations)
+        return self.k_start[idx] + (self.k_end[idx] - self.k_start[idx]) * s / self.length[idx]
+
+    def azimuth(self, stations):
+        """
+        切线方位角（rad）
+        :param stations: 桩号数组
+        """
+        idx, s = self._locate(stations)
+        dk = (self.k_end[idx] - self.k_start[idx]) / self.length[idx]
+        return self.theta[idx] + self.k_start[idx] * s + dk * s ** 2 / 2
+
+    def coord(self, stations):
+        """
+        中线坐标，与 GetCoord 相同，桩号超出范围时取起点或终点
+        :param stations: 桩号数组
+        :return: (..., 2) 数组，[Y, X]
+        """
+        idx, s = self._locate(stations)
+        dx, dy = _element_xy(self.theta[idx], self.k_start[idx], self.k_end[idx], self.length[idx], s)
+        return np.stack([self.x[idx] + dx, self.y[idx] + dy], axis=-1)
+
+    def direction(self, stations, det=_DET):
+        """
+        切线单位向量，与 GetDir 相同取桩号前后 det 两点的连线方向，桩号超出范围时为 nan
+        :param stations: 桩号数组
+        :param det: 取点间距（m）
+        :return: (..., 2) 数组，[dY, dX]
+        """
+        stations = np.asarray(stations, dtype=float)
+        d = self.coord(stations + det) - self.coord(stations - det)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return d / np.hypot(d[..., 0], d[..., 1])[..., None]
+
+    @property
+    def samples(self):
+        """按 step 加密的采样桩号及坐标（首次使用时计算）"""
+        if self._samples is None:
+            num = max(int(np.ceil((self.end - self.start) / self.step)), 1) + 1
+            stations = np.unique(np.r_[np.linspace(self.start, self.end, num), self.sta])
+            self._samples = stations, self.coord(stations)
+        return self._samples
+
+    @property
+    def tree(self):
+        """加密采样点的 KD 树（首次使用时建立），用于 O(log n) 最近点查询"""
+        if self._tree is None:
+            from scipy import spatial
+
+            self._tree = spatial.cKDTree(self.samples[1])
+        return self._tree
+
+    def _refine(self, s, px, py, iterations=6):
+        # 投影点处切线与连线正交，Gauss-Newton 迭代
+        for _ in range(iterations):
+            c = self.coord(s)
+            d = self.direction(s)
+            s = np.clip(s + (px - c[..., 0]) * d[..., 0] + (py - c[..., 1]) * d[..., 1], self.start, self.end)
+        return s
+
+    def station(self, x, y):
+        """
+        点到路线的最近投影桩号
+        :param x: 坐标数组（GetCoord 第 1 个分量）
+        :param y: 坐标数组（GetCoord 第 2 个分量）
+        :return: 桩号数组
+        """
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        px, py = x.ravel(), y.ravel()
+        nearest = self.tree.query(np.column_stack([px, py]))[1]
+        return self._refine(self.samples[0][nearest], px, py).reshape(x.shape)
+
+    def project(self, x, y):
+        """
+        点到路线的投影桩号及偏距，偏距与 GetPoint2D 的 offset 相同，以前进方向左侧为正
+        :param x: 坐标数组（GetCoord 第 1 个分量）
+        :param y: 坐标数组（GetCoord 第 2 个分量）
+        :return: 桩号数组, 偏距数组
+        """
+        x, y = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        s = self.station(x, y)
+        c = self.coord(s)
+        d = self.direction(s)
+        return s, d[..., 0] * (y - c[..., 1]) - d[..., 1] * (x - c[..., 0])
+
+    def intersect(self, x1, y1, x2, y2, chunk=256):
+        """
+        过两点的直线与路线交点桩号，无交点时为 nan（.NET GetStation 此时仍返回二分结果）
+        先由第一点的最近投影桩号出发 Newton 迭代，未收敛时在加密采样点中查找距第一点最近的交点
+        :param x1: 第一点坐标数组（GetCoord 第 1 个分量）
+        :param y1: 第一点坐标数组（GetCoord 第 2 个分量）
+        :param x2: 第二点坐标数组
+        :param y2: 第二点坐标数组
+        :param chunk: 逐点查找时的分块大小，控制矩阵内存
+        :return: 桩号数组
+        """
+        x1, y1, x2, y2 = np.broadcast_arrays(*[np.asarray(i, dtype=float) for i in (x1, y1, x2, y2)])
+        shape = x1.shape
+        x1, y1, x2, y2 = x1.ravel(), y1.ravel(), x2.ravel(), y2.ravel()
+        ux, uy = x2 - x1, y2 - y1
+        norm = np.hypot(ux, uy)
+
+        s = self.station(x1, y1)
+        for _ in range(8):
+            c = self.coord(s)
+            d = self.direction(s)
+            gs = ux * (c[:, 1] - y1) - uy * (c[:, 0] - x1)
+            dg = ux * d[:, 1] - uy * d[:, 0]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                s = np.clip(s - np.where(dg == 0, 0, gs / dg), self.start, self.end)
+        c = self.coord(s)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dist = np.abs(ux * (c[:, 1] - y1) - uy * (c[:, 0] - x1)) / norm
+        result = np.where(dist < 1e-6, s, np.nan)
+
+        # 未收敛（无交点或迭代发散）时逐点查找
+        stations, points = self.samples
+        rest = np.flatnonzero(np.isnan(result))
+        for i in range(0, len(rest), chunk):
+            k = rest[i:i + chunk]
+            result[k] = self._intersect(stations, points, x1[k], y1[k], x2[k], y2[k])
+        return result.reshape(shape)
+
+    def _intersect(self, stations, points, x1, y1, x2, y2):
+        # 采样点相对直线的有向距离，变号区间即为交点所在区间
+        ux, uy = x2 - x1, y2 - y1
+        g = ux[:, None] * (points[:, 1] - y1[:, None]) - uy[:, None] * (points[:, 0] - x1[:, None])
+        cross = (g[:, :-1] * g[:, 1:]) <= 0
+        d2 = (points[:-1, 0] - x1[:, None]) ** 2 + (points[:-1, 1] - y1[:, None]) ** 2
+        j = np.where(cross, d2, np.inf).argmin(axis=1)
+        rows = np.arange(len(x1))
+        found = cross[rows, j]
+
+        ga, gb = g[rows, j], g[rows, j + 1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            w = np.where(ga == gb, 0, ga / (ga - gb))
+        s = stations[j] + w * (stations[j + 1] - stations[j])
+        # Newton 迭代：g(s) = u x (C(s) - P1)，g'(s) = u x T(s)
+        for _ in range(6):
+            c = self.coord(s)
+            d = self.direction(s)
+            gs = ux * (c[:, 1] - y1) - uy * (c[:, 0] - x1)
+            dg = ux * d[:, 1] - uy * d[:, 0]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                s = np.clip(s - np.where(dg == 0, 0, gs / dg), self.start, self.end)
+        return np.where(found, s, np.nan)
+
+    def elevation(self, stations):
+        """
+        设计高程，与 .NET SQX.GetBG 相同：各变坡点竖曲线为二次抛物线，切线长为 半径 x |坡差| / 2，
+        首末点的坡差取相邻坡度的 2 倍，桩号超出范围时为 nan
+        :param stations: 桩号数组
+        """
+        stations = np.asarray(stations, dtype=float)
+        if len(self.sqx) < 2:
+            return np.full(stations.shape, np.nan)
+        k, z, r = self.sqx.T
+        grade = np.diff(z) / np.diff(k)
+        di = np.r_[2 * grade[0], np.diff(grade), -2 * grade[-1]]   # 各变坡点坡差
+        t = r * np.abs(di) / 2                                      # 切线长
+        sign = np.where(di >= 0, 1.0, -1.0)
+
+        i = np.clip(np.searchsorted(k, stations, side='right'), 1, len(k) - 1)
+        z_lin = z[i - 1] + (stations - k[i - 1]) * grade[i - 1]
+        before, after = k[i - 1] + t[i - 1], k[i] - t[i]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            y = np.where(stations <= before, (before - stations) ** 2 / r[i - 1] / 2 * sign[i - 1],
+                         np.where(stations >= after, (stations - after) ** 2 / r[i] / 2 * sign[i], 0))
+        z_lin += np.where(np.isfinite(y), y, 0)
+        # 首末点处直接取其高程
+        z_lin = np.where(stations == k[0], z[0], np.where(stations == k[-1], z[-1], z_lin))
+        return np.where((stations < k[0]) | (stations > k[-1]), np.nan, z_lin)
+
+    def ground(self, stations):
+        """
+        地面高程，桩号超出范围时为 nan
+        :param stations: 桩号数组
+        """
+        stations = np.asarray(stations, dtype=float)
+        if len(self.dmx) == 0:
+            return np.full(stations.shape, np.nan)
+        return np.interp(stations, self.dmx[:, 0], self.dmx[:, 1], left=np.nan, right=np.nan)
+
+    def crossfall(self, stations):
+        """
+        左、右侧横坡，与 .NET CG.GetHP 相同，桩号超出范围时为 nan
+        :param stations: 桩号数组
+        :return: (..., 2) 数组
+        """
+        stations = np.asarray(stations, dtype=float)
+        if len(self.cg) == 0:
+            return np.full(stations.shape + (2,), np.nan)
+        k = self.cg[:, 0]
+        result = self._crossfall(stations)
+        # 恰在中间数据点处取前后 1e-6 m 的平均值
+        hit = np.isin(stations, k[1:-1])
+        if np.any(hit):
+            result[hit] = (self._crossfall(stations[hit] + 1e-6) + self._crossfall(stations[hit] - 1e-6)) / 2
+        result[(stations < k[0]) | (stations > k[-1])] = np.nan
+        return result
+
+    def _crossfall(self, stations):
+        # 两侧横坡同向变化时，变化快的一侧线性内插，变化慢的一侧不超过变化快的一侧
+        k, left, right = self.cg.T
+        if len(k) == 1:
+            return np.broadcast_to(self.cg[0, 1:], stations.shape + (2,)).copy()
+        j = np.clip(np.searchsorted(k, stations, side='right'), 1, len(k) - 1)
+        i = j - 1
+        kl = (left[j] - left[i]) / (k[j] - k[i])
+        kr = (right[j] - right[i]) / (k[j] - k[i])
+        lin_l = left[i] + (stations - k[i]) * kl
+        lin_r = right[i] + (stations - k[i]) * kr
+
+        rotate = (kl * kr > 0) & (kl != kr)
+        fast_l = np.abs(kl) > np.abs(kr)
+        hl = np.where(rotate & ~fast_l, np.maximum(lin_r, np.where(kl > 0, left[i], left[j])), lin_l)
+        hr = np.where(rotate & fast_l, np.minimum(lin_l, np.where(kr > 0, right[j], right[i])), lin_r)
+        return np.stack([hl, hr], axis=-1)
+
+
+def ei_hash(icd, sqx=None, dmx=None, cg=None, step=1.0):
+    """
+    EI 数据内容哈希，行首尾空白的差异不影响结果
+    :param icd: 平曲线文本
+    :param sqx: 竖曲线文本
+    :param dmx: 地面线文本
+    :param cg: 超高文本
+    :param step: 加密采样步长（m）
+    :return: 十六进制字符串
+    """
+    h = hashlib.sha1(f'v2 {step!r}'.encode())
+    for text in (icd, sqx, dmx, cg):
+        h.update(b'\0' + '\n'.join(_lines(text)).encode())
+    return h.hexdigest()
+
+
+def cached_alignment(name, icd, sqx=None, dmx=None, cg=None, cache_dir='ei_cache', step=1.0):
+    """
+    按 EI 数据内容哈希读取缓存的路线，缓存不存在时解析、加密采样后写入缓存
+    :param name: 路线名称
+    :param icd: 平曲线文本
+    :param sqx: 竖曲线文本
+    :param dmx: 地面线文本
+    :param cg: 超高文本
+    :param cache_dir: 缓存目录
+    :param step: 加密采样步长（m）
+    :return: Alignment
+    """
+    path = os.path.join(cache_dir, ei_hash(icd, sqx, dmx, cg, step) + '.npz')
+    if os.path.exists(path):
+        align = Alignment.load(path)
+        align.name = name
+        return align
+
+    align = Alignment(name, icd, sqx, dmx, cg, step)
+    os.makedirs(cache_dir, exist_ok=True)
+    # 先写临时文件再改名，避免并行任务读到不完整的缓存
+    tmp = f'{path}.{os.getpid()}.npz'
+    align.save(tmp)
+    os.replace(tmp, path)
+    return align
+
+
+class PQX:
+    def __init__(self, align):
+        """
+        与 .NET curPQX 接口一致的平曲线包装，可直接用于 input_data 中的 get_distance 等函数
+        :param align: Alignment
+        """
+        self.align = align
+
+    def GetCoord(self, sta):
+        return tuple(self.align.coord(sta).tolist())
+
+    def GetDir(self, sta, det=_DET):
+        return tuple(self.align.direction(sta, det).tolist())
+
+    def GetStation(self, x1, y1, x2, y2):
+        return float(self.align.intersect(x1, y1, x2, y2))
+
+
+def validate(native, reference, stations=None, num=200):
+    """
+    与 .NET Align 计算结果对比，需在可加载 SmartRoadBridge.Alignment 的环境中运行
+    :param native: Alignment
+    :param reference: .NET Align 对象（或任何具有 curPQX.GetCoord / GetDir / GetStation 的对象）
+    :param stations: 对比桩号，默认在路线范围内均匀取 num 个
+    :param num: 默认对比桩号数
+    :return: dict，coord（m）、direction、station（m）的最大偏差
+    """
+    if stations is None:
+        stations = np.linspace(native.start, native.end, num)
+    stations = np.asarray(stations, dtype=float)
+    ref = reference.curPQX
+    coord = np.array([list(ref.GetCoord(float(s))) for s in stations])
+    direction = np.array([list(ref.GetDir(float(s))) for s in stations])
+
+    # 以各点法线反算桩号，GetStation 无交点时仍返回二分结果，仅对比其结果在法线上（与 .NET 判据相同，
+    # 叉积小于 0.001）的桩号
+    nx, ny = coord[:, 0] - direction[:, 1], coord[:, 1] + direction[:, 0]
+    station = np.array([ref.GetStation(*i) for i in zip(coord[:, 0], coord[:, 1], nx, ny)])
+    foot = np.array([list(ref.GetCoord(float(s))) for s in station])
+    on_line = np.abs(direction[:, 1] * (foot[:, 1] - coord[:, 1]) + direction[:, 0] * (foot[:, 0] - coord[:, 0])) < 1e-3
+    return {
+        'coord': np.abs(native.coord(stations) - coord).max(),
+        'direction': np.abs(native.direction(stations) - direction).max(),
+        'station': np.abs(native.intersect(coord[:, 0], coord[:, 1], nx, ny) - station)[on_line].max(initial=0),
+    }
@@ -0,0 +1,255 @@
+"""混凝土截面验算性能基准
+
+以典型截面和固定随机种子生成的合成内力组合（10^3 ~ 10^6 组）测量各验算路径的
+吞吐量（组/s）、峰值内存及逐组计算与批量计算的加速比，不依赖外部数据，可离线运行。
+
+用法：
+    python bench_concrete.py                          # 默认规模 1e3, 1e4, 1e5
+    python bench_concrete.py --sizes 1000 1000000     # 指定规模
+    python bench_concrete.py --save base.json         # 保存结果
+    python bench_concrete.py --baseline base.json     # 与保存结果比较，吞吐量下降超过容差时非零退出
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import concrete as cc
+
+SEED = 20201
+
+
+def circular_pile():
+    """2.2 m 桩基，44 根 Φ32（同 concrete.py __main__）"""
+    return cc.CircularCompress(2.2, 44, 32, 13.8, 415, 400, hoop=12)
+
+
+def rectangle_column():
+    """1.8 m x 1.8 m 矩形墩柱，每侧 17 根 Φ32"""
+    return cc.RectangleCompress(1.8, 1.8, 32, 32, 17, 17, 22.4, 415, 400, 0.094, 0.094)
+
+
+BEAM = dict(b=2.1, h=2.2, fcd=22.4, ad1=32, anum1=14, fsd1=415, ad2=32, anum2=16, fsd2=400, a=40, pnum=10 * 15)
+
+
+def rectangle_beam():
+    """2.1 m x 2.2 m 预应力矩形梁"""
+    return cc.RectangleBend(**BEAM)
+
+
+def compress_loads(env, n, rng):
+    """
+    在相关曲线内外随机生成偏压内力组合
+    :param env: 截面 Envelope
+    :param n: 组合数
+    :param rng: 随机数生成器
+    :return: nd, md
+    """
+    idx = rng.choice(np.flatnonzero(env.n > 0), n)
+    nd = env.n[idx] * rng.uniform(0.3, 1.2, n)
+    md = nd * (env.e[idx] - env.shift)
+    if env.symmetric:
+        md *= rng.choice([-1, 1], n)
+    return nd, md
+
+
+def bend_loads(sec, n, rng):
+    """
+    随机生成受弯构件弯矩、剪力组合
+    :param sec: RectangleBend 截面
+    :param n: 组合数
+    :param rng: 随机数生成器
+    :return: md, vd
+    """
+    md = sec.evaluate().m_resistance * rng.uniform(0.2, 1.2, n)
+    vd = sec.evaluate_shear().vr * rng.uniform(0.2, 1.2, n)
+    return md, vd
+
+
+def _scalar(func):
+    # 逐组调用，个别组合无解时跳过
+    def run(*loads):
+        for args in zip(*loads):
+            try:
+                func(*args)
+            except ValueError:
+                pass
+    return run
+
+
+def _cold(cache, sec, num=None):
+    # 清空相关曲线缓存后重新生成，计入生成耗时
+    def run(nd, md):
+        cache.cache_clear()
+        env = sec.envelope() if num is None else sec.envelope(num)
+        env.utilization(nd, md)
+    return run
+
+
+def cases():
+    """
+    基准用例：(截面, 路径, 是否逐组计算, 内力生成函数, 计算函数, 加速比基准路径)
+    批量路径的加速比以同一截面上计算相同内容的逐组路径为基准；envelope 计入相关曲线生成耗时（冷启动），
+    envelope_warm 为相关曲线已缓存时的吞吐量
+    """
+    pile = circular_pile()
+    column = rectangle_column()
+    beam = rectangle_beam()
+    pile_env = pile.envelope()
+    column_env = column.envelope()
+
+    def pile_loads(n, rng):
+        return compress_loads(pile_env, n, rng)
+
+    def column_loads(n, rng):
+        return compress_loads(column_env, n, rng)
+
+    def beam_loads(n, rng):
+        return bend_loads(beam, n, rng)
+
+    def beam_scalar(md, vd):
+        beam.evaluate(md)
+        beam.evaluate_shear(vd)
+
+    return [
+        ('circular', 'evaluate', True, pile_loads, _scalar(pile.evaluate), None),
+        ('circular', 'capacity_sweep', True, pile_loads, pile.capacity_sweep, 'evaluate'),
+        ('circular', 'capacity_grid', False, pile_loads, lambda nd, md: cc.circular_capacity_grid([pile], nd, md),
+         'evaluate'),
+        ('circular', 'envelope', False, pile_loads, _cold(cc.circular_envelope, pile), 'evaluate'),
+        ('circular', 'envelope_warm', False, pile_loads, pile_env.utilization, 'evaluate'),
+        ('circular', 'crack_width', True, pile_loads, _scalar(pile.crack_width), None),
+        ('circular', 'crack_width_batch', False, pile_loads, pile.crack_width_batch, 'crack_width'),
+        ('rectangle', 'evaluate', True, column_loads, _scalar(column.evaluate), None),
+        ('rectangle', 'capacity_sweep', True, column_loads, column.capacity_sweep, 'evaluate'),
+        ('rectangle', 'capacity_batch', False, column_loads, column.capacity_batch, 'evaluate'),
+        ('rectangle', 'envelope', False, column_loads, _cold(cc.rectangle_envelope, column), 'evaluate'),
+        ('rectangle', 'envelope_warm', False, column_loads, column_env.utilization, 'evaluate'),
+        ('bend', 'evaluate', True, beam_loads, _scalar(beam_scalar), None),
+        ('bend', 'batch', False, beam_loads, lambda md, vd: cc.rectangle_bend_batch(**BEAM, md=md, vd=vd),
+         'evaluate'),
+    ]
+
+
+def measure(func, loads, repeat=5, memory=True, budget=2.0):
+    """
+    计时（取多次运行的最小值）并记录峰值内存
+    :param func: 计算函数
+    :param loads: 内力数组元组
+    :param repeat: 最多重复次数
+    :param memory: 是否另行运行一次记录峰值内存（tracemalloc 会拖慢计时，故分开运行）
+    :param budget: 累计耗时超过该值（s）后不再重复
+    :return: 耗时（s）, 峰值内存（MB，未记录时为 nan）
+    """
+    elapsed, total = np.inf, 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func(*loads)
+        t = time.perf_counter() - t0
+        elapsed, total = min(elapsed, t), total + t
+        if total > budget:
+            break
+
+    peak = np.nan
+    if memory:
+        tracemalloc.start()
+        func(*loads)
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return elapsed, peak
+
+
+def run(sizes, scalar_max=2000, repeat=5, memory=True):
+    """
+    运行全部用例
+    :param sizes: 内力组合规模列表
+    :param scalar_max: 逐组计算路径的最大组合数，超出部分按吞吐量外推
+    :param repeat: 每个用例最多重复次数
+    :param memory: 是否记录峰值内存
+    :return: 结果列表，每项为 dict
+    """
+    results = []
+    for sec, path, scalar, make_loads, func, base in cases():
+        for n in sizes:
+            loads = make_loads(n, np.random.default_rng(SEED))
+            if scalar:
+                loads = tuple(i[:scalar_max] for i in loads)
+            count = len(loads[0])
+            elapsed, peak = measure(func, loads, repeat, memory and not scalar)
+            results.append({'section': sec, 'path': path, 'base': base, 'n': n, 'checked': count,
+                            'time': elapsed, 'rate': count / elapsed, 'peak_mb': peak})
+    return results
+
+
+def speedups(results):
+    """
+    各路径相对其逐组计算基准路径（同一截面、同一规模）的加速比
+    :return: {(截面, 路径, 规模): 加速比}
+    """
+    rate = {(r['section'], r['path'], r['n']): r['rate'] for r in results}
+    return {(r['section'], r['path'], r['n']): r['rate'] / rate[r['section'], r['base'], r['n']]
+            for r in results if r.get('base') and (r['section'], r['base'], r['n']) in rate}
+
+
+def report(results):
+    ratio = speedups(results)
+    print(f'{"section":<11}{"path":<16}{"n":>9}{"checked":>9}{"time (s)":>10}{"checks/s":>12}'
+          f'{"peak MB":>9}{"speedup":>9}')
+    for r in results:
+        s = ratio.get((r['section'], r['path'], r['n']))
+        peak = '-' if np.isnan(r['peak_mb']) else f'{r["peak_mb"]:.1f}'
+        s = '-' if s is None else f'{s:.1f}x'
+        print(f'{r["section"]:<11}{r["path"]:<16}{r["n"]:>9}{r["checked"]:>9}{r["time"]:>10.3f}{r["rate"]:>12.0f}'
+              f'{peak:>9}{s:>9}')
+
+
+def compare(results, baseline, tol=0.3):
+    """
+    与基准结果比较吞吐量
+    :param results: 本次结果
+    :param baseline: 基准结果
+    :param tol: 允许的吞吐量下降比例
+    :return: 退化的用例列表
+    """
+    base = {(r['section'], r['path'], r['n']): r['rate'] for r in baseline}
+    slow = []
+    for r in results:
+        key = (r['section'], r['path'], r['n'])
+        if key in base and r['rate'] < base[key] * (1 - tol):
+            slow.append((key, base[key], r['rate']))
+    return slow
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--scalar-max', type=int, default=2000, help='逐组计算路径的最大组合数')
+    parser.add_argument('-n', '--repeat', type=int, default=5, help='每个用例最多重复次数')
+    parser.add_argument('--no-memory', action='store_true', help='不记录峰值内存')
+    parser.add_argument('--save', help='结果保存路径（json）')
+    parser.add_argument('--baseline', help='基准结果路径（json）')
+    parser.add_argument('--tol', type=float, default=0.3, help='允许的吞吐量下降比例')
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.scalar_max, args.repeat, not args.no_memory)
+    report(results)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=1)
+    if args.baseline:
+        with open(args.baseline) as f:
+            slow = compare(results, json.load(f), args.tol)
+        for key, old, new in slow:
+            print(f'regression: {key} {old:.0f} -> {new:.0f} checks/s')
+        if slow:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
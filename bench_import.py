@@ -0,0 +1,105 @@
+"""模块导入耗时基准
+
+每个模块在独立的解释器中导入，取多次测量的最小值与预算比较，
+同时检查导入后是否提前加载了重型依赖。超出预算时以非零状态退出。
+
+用法：python bench_import.py [-n 重复次数] [--scale 预算放大系数]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+current_path = os.path.dirname(os.path.abspath(__file__))
+
+# 各模块导入耗时预算（s），numpy/pandas/scipy 本身约占 0.3 ~ 0.5 s
+BUDGET = {
+    'concrete': 1.0,
+    'fiber': 1.0,
+    'steel': 0.6,
+    'wind': 0.6,
+    'pile': 0.6,
+    'report': 0.6,
+    'cad': 0.3,
+    'midas': 0.6,
+    'input_data': 0.6,
+    'alignment': 0.3,
+    'tendon_new': 0.6,
+    'tendon_new1': 0.6,
+    'tendon_r2': 0.6,
+}
+
+# 仅在使用时才应加载的重型依赖
+HEAVY = ('sympy', 'matplotlib', 'sectionproperties', 'pylatex', 'win32com', 'clr', 'pymysql')
+
+PROBE = '''
+import json, sys, time
+t0 = time.perf_counter()
+try:
+    import {0}
+except Exception as e:
+    print(json.dumps({{'error': repr(e), 'missing': isinstance(e, ImportError)}}))
+else:
+    t = time.perf_counter() - t0
+    heavy = sorted({{m.split('.')[0] for m in sys.modules}} & set({1!r}))
+    print(json.dumps({{'time': t, 'heavy': heavy}}))
+'''
+
+
+def measure(module, repeat=5):
+    """
+    在独立解释器中导入模块并计时
+    :param module: 模块名
+    :param repeat: 重复次数，取最小值
+    :return: dict，time（s）、heavy（已加载的重型依赖）或 error、missing（是否缺少依赖）
+    """
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', PROBE.format(module, HEAVY)], cwd=current_path,
+                             capture_output=True, text=True).stdout
+        res = json.loads(out.strip().splitlines()[-1])
+        if 'error' in res:
+            return res
+        if best is None or res['time'] < best['time']:
+            best = res
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', '--repeat', type=int, default=5)
+    parser.add_argument('--scale', type=float, default=1.0, help='预算放大系数，用于较慢的机器')
+    parser.add_argument('modules', nargs='*', default=list(BUDGET))
+    args = parser.parse_args(argv)
+
+    failed = []
+    print(f'{"module":<14}{"time (s)":>10}{"budget":>10}  status')
+    for module in args.modules:
+        budget = BUDGET.get(module, 1.0) * args.scale
+        res = measure(module, args.repeat)
+        if 'error' in res:
+            # 缺少可选依赖时跳过，其余导入错误视为失败
+            if not res['missing']:
+                failed.append(module)
+            status = 'skipped: ' if res['missing'] else 'error: '
+            print(f'{module:<14}{"-":>10}{budget:>10.2f}  {status}{res["error"]}')
+            continue
+        status = 'ok'
+        if res['time'] > budget:
+            status = 'over budget'
+        if res['heavy']:
+            status = 'eager import: ' + ', '.join(res['heavy'])
+        if status != 'ok':
+            failed.append(module)
+        print(f'{module:<14}{res["time"]:>10.3f}{budget:>10.2f}  {status}')
+
+    if failed:
+        print('failed: ' + ', '.join(failed))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,11 +3,9 @@
 1. 截面计算（单位：m）
 """
 
-import win32com.client as win32
 import numpy as np
-import sectionproperties.pre.sections as sections
-from sectionproperties.analysis.cross_section import CrossSection
 
+# import win32com.client as win32
 # acad = win32.Dispatch("AutoCAD.Application")
 # doc = acad.ActiveDocument
 # ms = doc.ModelSpace
@@ -106,6 +104,9 @@ class OneSec:
         :return: 无
         """
 
+        import sectionproperties.pre.sections as sections
+        from sectionproperties.analysis.cross_section import CrossSection
+
         self.geo = sections.CustomSection(self.ids, self.faces, self.points[1:], [self.points[0]])
         self.mesh = self.geo.create_mesh(mesh_sizes=[mesh])
         self.sec = CrossSection(self.geo, self.mesh)
@@ -0,0 +1,282 @@
+"""路线计算回归检查
+
+以 ei_tbl 格式编写的主线 M1K 与匝道 A 两条路线（含全部 6 类平曲线线元、竖曲线、地面线及超高），
+将 alignment.Alignment 的坐标、切线方向、设计高程、横坡、地面高程及主线法线与匝道的交点，
+与 SmartRoadBridge.Alignment.dll 的计算结果对比，超出容差时以非零状态退出。
+
+参考值由该 .NET 程序集计算（PQX.GetCoord、PQX.GetDir、SQX.GetBG、CG.GetHP、DMX.GetBG 及
+input_data.get_distance），各路线另取超出起终点 10 m 的桩号检查范围外的处理，.NET 抛出异常或
+返回 nan 处记为 nan。.NET GetStation 在法线与匝道无交点时仍返回二分结果，alignment 返回 nan，
+此类桩号不列入参考值。
+
+用法：
+    python check_alignment.py            # 与内置参考值对比，不依赖 .NET
+    python check_alignment.py --dotnet   # 另外加载 SmartRoadBridge.Alignment 以 alignment.validate 实时对比
+                                         # （Linux 下需设置 PYTHONNET_RUNTIME=coreclr）
+"""
+
+import argparse
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+import input_data
+
+# 各路线 EI 数据，各段文本按行给出，与 ei_tbl 相同以 \r\n 连接
+EI = {
+    'M1K': {
+        'ICD': (
+            '12000',
+            '3389123.456,512345.678,1.2345',
+            '1,350.5',
+            '3,180,450,1',
+            '2,450,210.3,1',
+            '4,180,450,1',
+            '1,220',
+            '3,200,800,-1',
+            '2,800,150,-1',
+            '4,200,800,-1',
+            '1,300',
+            '0,0,0',
+        ),
+        'SQX': (
+            '12000 435.20 0',
+            '12400 441.80 18000',
+            '12900 436.10 12000',
+            '13480 439.00 0',
+        ),
+        'DMX': (
+            '11990 430.1',
+            '12100 433.4',
+            '12380 439.0',
+            '12700 430.2',
+            '13100 428.6',
+            '13490 437.5',
+        ),
+        'CG': (
+            '1 0 0 0 1 0 2',
+            '12000 -2 -2',
+            '12330 -2 -2',
+            '12380 2 -2',
+            '12422.5 4 -4',
+            '12632.8 4 -4',
+            '12704.8 -2 -2',
+            '12924.8 -2 -2',
+            '12960 -2 2',
+            '12974.8 -3 3',
+            '13124.8 -3 3',
+            '13174.8 -2',
+            '13474.8 -2 -2',
+        ),
+    },
+    'A': {
+        'ICD': (
+            '0',
+            '3389184.283,512483.315,1.2345',
+            '1,120.5',
+            '// 分流后左转',
+            '3,90,300,-1',
+            '2,300,60,-1',
+            '5,120,300,150,-1',
+            '2,150,45.8,-1',
+            '6,120,150,600,-1',
+            '4,240,600,-1',
+            '1,80,1',
+        ),
+        'SQX': (
+            '0 436.60 0',
+            '150 439.25 4000',
+            '549.3 431.20 0',
+        ),
+        'DMX': (
+            '0 432.0',
+            '200 431.1',
+            '549.3 428.4',
+        ),
+        'CG': (
+            '1 0 0 0 1 0 2',
+            '0 -2 -2',
+            '120.5 -2 -2',
+            '147.5 3 -3',
+            '300 3 -3',
+            '469.3 2',
+            '549.3 -2 -2',
+        ),
+    },
+}
+
+# 各路线参考值：桩号, GetCoord (2), GetDir (2), 设计高程, 左、右横坡, 地面高程
+POINTS = {
+    'M1K': [
+        (11990.0, 512345.678, 3389123.456, np.nan, np.nan, np.nan, np.nan, np.nan, 430.1),
+        (12000.0, 512345.678, 3389123.456, 0.9439767196817653, 0.330012049323739, 435.2, -2.0, -2.0, 430.40000000000003),
+        (12105.15, 512444.93784651277, 3389158.15478053, 0.943983972689397, 0.32999130186346415, 436.934975, -2.0, -2.0, 433.503),
+        (12245.35, 512577.2843085298, 3389204.4198212363, 0.943983972689397, 0.32999130186346415, 438.989869375, -2.0, -2.0, 436.307),
+        (12350.5, 512676.54415504256, 3389239.118601766, 0.943983972689397, 0.32999130186346415, 439.85429, -0.3599999999999999, -2.0, 438.41),
+        (12372.1, 512696.95119592, 3389246.197481107, 0.9463334438378508, 0.3231919136890547, 439.95581, 1.3680000000000292, -2.0, 438.842),
+        (12400.9, 512724.3309006951, 3389255.1260999846, 0.9561926238288088, 0.29273822117273707, 440.05084999999997, 2.983529411764689, -2.983529411764689, 438.42525),
+        (12422.5, 512745.1007657265, 3389261.051288105, 0.9673396405758362, 0.25348376628615066, 440.09189, 3.9999999764705803, -3.9999999764705803, 437.83125),
+        (12485.59, 512807.0495205738, 3389272.721091862, 0.9932686931088913, 0.11583308374447712, 440.063341775, 4.0, -4.0, 436.096275),
+        (12569.71, 512891.0255883675, 3389274.621766192, 0.9974919197117262, -0.07078043592557882, 439.681296775, 4.0, -4.0, 433.782975),
+        (12632.8, 512953.438893029, 3389265.766714071, 0.9778181700540991, -0.20945554734132227, 439.13677750000005, 3.9999999583333192, -3.9999999861111064, 432.048),
+        (12654.4, 512974.4555676236, 3389260.7873027576, 0.9684526270845182, -0.2491977309148206, 438.89984000000004, 2.19999999999997, -3.3999999999999897, 431.454),
+        (12683.2, 513002.21120009676, 3389253.1065909015, 0.9599861128539041, -0.2800476086804731, 438.57152, -0.1999999999999691, -2.6000000000000103, 430.66200000000003),
+        (12704.8, 513022.917619857, 3389246.958255738, 0.9579482748602692, -0.2869409393799253, 438.32528, -1.9999999583333192, -2.0000000138888936, 430.1808),
+        (12770.8, 513086.14211037295, 3389228.0198345, 0.9579482748602692, -0.2869409393799253, 437.57288000000005, -2.0, -2.0, 429.9168),
+        (12858.8, 513170.4414310609, 3389202.768606182, 0.9579482748602692, -0.2869409393799253, 436.70600666666667, -2.0, -2.0, 429.5648),
+        (12924.8, 513233.66592157684, 3389183.830184944, 0.9579482748602692, -0.2869409393799253, 436.4497066666667, -2.0, -1.999999943181799, 429.30080000000004),
+        (12939.8, 513248.0391477733, 3389179.539472823, 0.9587466571602791, -0.28426193446184483, 436.4420816666667, -2.0, -0.2954545454545807, 429.24080000000004),
+        (12959.8, 513267.244535161, 3389173.958448596, 0.9622269499543458, -0.27224859371823557, 436.46108166666664, -2.0, 1.977272727272645, 429.1608),
+        (12974.8, 513281.70802611386, 3389169.983193002, 0.9664486951295658, -0.25685972763817944, 436.49720666666667, -2.9999999662162047, 2.9999999662162047, 429.1008),
+        (13019.8, 513325.50012897083, 3389159.6527598975, 0.9793560042313544, -0.20214306066742826, 436.699, -3.0, 3.0, 428.92080000000004),
+        (13079.8, 513384.6611104954, 3389149.7385740294, 0.9917517269021704, -0.1281737577921587, 436.999, -3.0, 3.0, 428.68080000000003),
+        (13124.8, 513429.4285406909, 3389145.2282176744, 0.997388431179554, -0.07222407735089528, 437.224, -2.9999999899999965, 2.999999949999983, 429.1659487179487),
+        (13139.8, 513444.39781662537, 3389144.2711358713, 0.9984126715754972, -0.056321729709574705, 437.29900000000004, -2.7, 1.5, 429.5082564102564),
+        (13159.8, 513464.37341854087, 3389143.2862174716, 0.9990384767691964, -0.043842011070249036, 437.399, -2.3, -0.5, 429.9646666666667),
+        (13174.8, 513479.3602012673, 3389142.6567849517, 0.9991581296002862, -0.04102477365760668, 437.474, -2.0000000100000035, -1.9999999499999834, 430.30697435897434),
+        (13264.8, 513569.28443028586, 3389138.964490893, 0.9991581296002862, -0.04102477365760668, 437.924, -2.0, -2.0, 432.3608205128205),
+        (13384.8, 513689.1834023106, 3389134.041432148, 0.9991581296002862, -0.04102477365760668, 438.524, -2.0, -2.0, 435.09928205128205),
+        (13474.8, 513779.10763132916, 3389130.349138089, 0.9991581296002862, -0.04102477365760668, 438.974, -2.0, -2.0, 437.1531282051282),
+        (13484.8, 513779.10763132916, 3389130.349138089, np.nan, np.nan, np.nan, np.nan, np.nan, 437.3813333333333),
+    ],
+    'A': [
+        (-10.0, 512483.315, 3389184.283, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan),
+        (0.0, 512483.315, 3389184.283, 0.9439767196817653, 0.330012049323739, 436.6, -2.0, -2.0, 432.0),
+        (36.15, 512517.4399971606, 3389196.21225265, 0.943983972689397, 0.32999130186346415, 437.23865, -2.0, -2.0, 431.837325),
+        (84.35, 512562.93999337475, 3389212.11792285, 0.9439842896125106, 0.3299903952613832, 438.07767359565, -2.0, -2.0, 431.620425),
+        (120.5, 512597.0649905353, 3389224.0471755, 0.9439767196817653, 0.330012049323739, 438.4625605882777, -1.9999999074074077, -2.0000000185185183, 431.45775000000003),
+        (128.6, 512604.70763444656, 3389226.7304381384, 0.9426403520528995, 0.33381007576402755, 438.5039977022898, -0.5000000000000011, -2.3, 431.42130000000003),
+        (139.4, 512614.8595685222, 3389230.414871838, 0.936482303044335, 0.35071483584926716, 438.5337321876391, 1.5000000000000009, -2.7, 431.3727),
+        (147.5, 512622.41375163913, 3389233.3374446365, 0.9281801401713572, 0.3721311964771023, 438.5368968016511, 2.9999999074074073, -2.9999999814814817, 431.33625),
+        (165.5, 512638.91013676097, 3389240.5327270892, 0.9042019741608307, 0.42710512748462326, 438.48520427723344, 3.0, -3.0, 431.25525000000005),
+        (189.5, 512660.17795774597, 3389251.640051523, 0.8671758496806594, 0.49800205394217656, 438.2902809113431, 3.0, -3.0, 431.14725000000004),
+        (207.5, 512675.5088900491, 3389261.0668922653, 0.8357515019734805, 0.5491078463736166, 438.04958838692534, 3.0, -3.0, 431.0420269109648),
+        (221.9, 512687.32929178985, 3389269.287925989, 0.804178318892148, 0.5943881151434631, 437.7987143673912, 3.0, -3.0, 430.9307185800172),
+        (241.1, 512702.224394335, 3389281.391337028, 0.743502932942934, 0.668732673573869, 437.41339844728276, 3.0, -3.0, 430.78230747208704),
+        (255.5, 512712.50166312675, 3389291.4710936304, 0.6812785269750182, 0.732024295145147, 437.12309040821435, 3.0, -3.0, 430.6709991411394),
+        (269.24, 512721.3889287112, 3389301.9435405526, 0.6114470040972125, 0.7912853854207997, 436.84608815427, 3.0, -3.0, 430.56479244202694),
+        (287.56, 512731.67884836387, 3389317.0869538686, 0.510505938670607, 0.8598742271879315, 436.4767518156774, 3.0, -3.0, 430.42318350987694),
+        (301.3, 512738.1425836372, 3389329.206184885, 0.4297059261490147, 0.902968890401224, 436.19974956173303, 2.9923213230950974, -2.9616066154754868, 430.3169768107644),
+        (322.9, 512746.100192919, 3389349.2711070417, 0.311118067506718, 0.9503712685423972, 435.76428750313045, 2.8647371529828702, -2.3236857649143525, 430.15001431434297),
+        (351.7, 512753.26479115983, 3389377.147799711, 0.19511026510995774, 0.9807813132644413, 435.18367142499375, 2.6946249261665685, -1.4731246308328416, 429.9273976524478),
+        (373.3, 512756.86703158804, 3389398.4427809734, 0.14367706258297475, 0.9896246266577687, 434.74820936639117, 2.5670407560543413, -0.8352037802717067, 429.76043515602635),
+        (402.1, 512760.38787445874, 3389427.024739848, 0.10318283674251799, 0.9946624061468127, 434.16759328825447, 2.396928529238039, 0.01535735380980574, 429.5378184941311),
+        (440.5, 512763.6567307503, 3389465.2836918933, 0.07130785813581185, 0.9974543545286085, 433.39343851740546, 2.1701122268163022, 1.149438865918488, 429.2409962782708),
+        (469.3, 512765.57243307907, 3389494.019840778, 0.0641219863040967, 0.997942067893932, 432.8128224392687, 1.9999999779533373, 1.9999999602333136, 429.01837961637557),
+        (493.3, 512767.11137650727, 3389517.970449395, 0.0641219863040967, 0.997942067893932, 432.3289757074881, 0.7999999999999992, 0.7999999999999992, 428.8328657314629),
+        (525.3, 512769.1633010782, 3389549.9045942174, 0.0641248847392184, 0.9979418816530259, 431.6838467317806, -0.7999999999999994, -0.7999999999999994, 428.58551388491264),
+        (549.3, 512770.70224450633, 3389573.8552028346, 0.06412049644478855, 0.9979421636225587, 431.2, -2.0, -2.0, 428.4),
+        (559.3, 512770.70224450633, 3389573.8552028346, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan),
+    ],
+}
+
+# 主线 M1K 法线与匝道 A 的交点：主线桩号, 匝道桩号, 距离
+DISTANCE = [
+    (np.float64(12170.0), 20.00050855761992, 12.000405402341892),
+    (np.float64(12210.0), 60.000233279299096, 12.000405404822548),
+    (np.float64(12250.0), 100.00049703168595, 12.000405402255764),
+    (np.float64(12290.0), 140.00157207985256, 12.153005742311766),
+    (np.float64(12330.0), 180.18328552271788, 15.649459619501442),
+    (np.float64(12370.0), 221.38599379025237, 24.807434860531348),
+    (np.float64(12410.0), 267.89743383627, 44.93070894836341),
+    (np.float64(12450.0), 343.968025294944, 104.36079735301551),
+]
+
+# 各项容差
+TOL = {
+    'coord': 1e-6,
+    'direction': 1e-6,
+    'elevation': 1e-9,
+    'crossfall': 1e-9,
+    'ground': 1e-9,
+    'station': 1e-6,
+    'distance': 1e-6,
+}
+
+
+def ei_rows():
+    """EI 数据行，字段与 ei_tbl 相同"""
+    return [SimpleNamespace(Name=name, **{k: '\r\n'.join(v) for k, v in texts.items()}) for name, texts in EI.items()]
+
+
+def deviation(a, b):
+    """两数组最大偏差，nan 位置不一致时为 inf"""
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    if np.any(np.isnan(a) != np.isnan(b)):
+        return np.inf
+    return np.nanmax(np.abs(a - b), initial=0)
+
+
+def check(lines):
+    """
+    与参考值对比
+    :param lines: 路线字典（alignment.Alignment）
+    :return: dict，各项最大偏差
+    """
+    res = dict.fromkeys(TOL, 0.0)
+    for name, rows in POINTS.items():
+        ref = np.array(rows)
+        st, line = ref[:, 0], lines[name]
+        for key, value, cols in (('coord', line.coord(st), [1, 2]), ('direction', line.direction(st), [3, 4]),
+                                 ('elevation', line.elevation(st), [5]), ('crossfall', line.crossfall(st), [6, 7]),
+                                 ('ground', line.ground(st), [8])):
+            res[key] = max(res[key], deviation(value, ref[:, cols].reshape(value.shape)))
+
+    ref = np.array(DISTANCE)
+    single = np.array([input_data.get_distance('A', s, lines, 'M1K') for s in ref[:, 0]])
+    batch = np.column_stack(input_data.get_distance_batch('A', ref[:, 0], lines, 'M1K'))
+    res['station'] = max(deviation(single[:, 0], ref[:, 1]), deviation(batch[:, 0], ref[:, 1]))
+    res['distance'] = max(deviation(single[:, 1], ref[:, 2]), deviation(batch[:, 1], ref[:, 2]))
+    return res
+
+
+def check_dotnet(lines):
+    """
+    加载 SmartRoadBridge.Alignment 以 alignment.validate 实时对比
+    :param lines: 路线字典（alignment.Alignment）
+    :return: dict，各项最大偏差
+    """
+    import alignment
+
+    res = {}
+    reference = {}
+    for row in ei_rows():
+        input_data.get_ei(row, reference)
+        for key, value in alignment.validate(lines[row.Name], reference[row.Name], num=500).items():
+            res[key] = max(res.get(key, 0.0), value)
+    return res
+
+
+def report(title, res):
+    """打印各项偏差，返回超出容差的项"""
+    print(title)
+    failed = []
+    for key, value in res.items():
+        status = 'ok' if value <= TOL[key] else 'failed'
+        if status != 'ok':
+            failed.append(key)
+        print(f'  {key:<12}{value:>12.3e}{TOL[key]:>12.1e}  {status}')
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dotnet', action='store_true', help='加载 SmartRoadBridge.Alignment 实时对比')
+    args = parser.parse_args(argv)
+
+    lines = {}
+    for row in ei_rows():
+        input_data.get_ei(row, lines, native=True)
+
+    failed = report('reference values', check(lines))
+    if args.dotnet:
+        failed += report('SmartRoadBridge.Alignment', check_dotnet(lines))
+    if failed:
+        print('failed: ' + ', '.join(failed))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,8 @@
-import sympy
+import functools
+from concurrent import futures
+from typing import NamedTuple
 import numpy as np
-import matplotlib.pyplot as plt
+import pandas as pd
 from scipy import optimize
 
 
@@ -8,6 +10,268 @@ def get_as(rebar_d, num):
     return np.pi * (rebar_d / 2) ** 2 * num
 
 
+def warm_sweep(f, params, lo, hi, warm=True, width=1e-3):
+    """
+    逐个求解一组参数相近的标量方程 f(x, p) = 0，以上一个根为中心取小区间热启动，不变号时逐步扩大区间
+    :param f: 标量目标函数 f(x, p)
+    :param params: 按变化顺序排列的参数数组
+    :param lo: 求解区间下限
+    :param hi: 求解区间上限
+    :param warm: 是否热启动，False 时每次均在 [lo, hi] 内求解
+    :param width: 热启动区间最小半宽
+    :return: 根、迭代次数（含区间扩大次数）、是否收敛
+    """
+    x = np.full(len(params), np.nan)
+    iterations = np.zeros(len(params), dtype=int)
+    converged = np.zeros(len(params), dtype=bool)
+    x_prev, step = None, width
+
+    for i, p in enumerate(params):
+        a, b, expand = lo, hi, 0
+        if warm and x_prev is not None:
+            a, b = max(x_prev - step, lo), min(x_prev + step, hi)
+            f_a, f_b = f(a, p), f(b, p)
+            while f_a * f_b > 0 and (a > lo or b < hi):
+                step *= 2
+                expand += 1
+                a, b = max(x_prev - step, lo), min(x_prev + step, hi)
+                f_a, f_b = f(a, p), f(b, p)
+        try:
+            root, res = optimize.brentq(f, a, b, args=(p,), full_output=True)
+        except ValueError:
+            iterations[i] = expand
+            continue
+
+        x[i] = root
+        iterations[i] = res.iterations + expand
+        converged[i] = res.converged
+        step = width if x_prev is None else max(2 * abs(root - x_prev), width)
+        x_prev = root
+    return x, iterations, converged
+
+
+def snap_spacing(space, step=10, s_min=100, s_max=400):
+    """
+    将计算间距向下取整至施工模数
+    :param space: 计算允许的最大间距数组（mm）
+    :param step: 取整模数（mm）
+    :param s_min: 最小施工间距（mm），小于该值时为 nan
+    :param s_max: 构造最大间距（mm）
+    """
+    space = np.floor(np.minimum(space, s_max) / step) * step
+    return np.where(space >= s_min, space, np.nan)
+
+
+def bracket_root(f, lo, hi, fprime=None, x0=None, xtol=1e-10, maxiter=100):
+    """
+    向量化的区间求根（Illinois 试位法或给定导数时的牛顿法，收敛过慢时退化为二分）
+    :param f: 目标函数，接收并返回同形状数组
+    :param lo: 区间下限（数组）
+    :param hi: 区间上限（数组）
+    :param fprime: 目标函数导数，给定时采用带区间保护的牛顿迭代
+    :param x0: 牛顿迭代初值，默认取区间中点
+    :param xtol: 区间收敛容差
+    :param maxiter: 最大迭代次数
+    :return: 根、是否收敛、迭代次数（均为数组；区间两端不变号时根为 nan）
+    """
+    lo, hi = np.broadcast_arrays(np.asarray(lo, dtype=float), np.asarray(hi, dtype=float))
+    lo, hi = lo.copy(), hi.copy()
+    f_lo, f_hi = f(lo), f(hi)
+    valid = np.sign(f_lo) * np.sign(f_hi) <= 0
+    active = valid & (f_lo != 0) & (f_hi != 0)
+    x = np.where(f_lo == 0, lo, hi)
+    iterations = np.zeros(lo.shape, dtype=int)
+    side = np.zeros(lo.shape, dtype=int)        # 上一步保留的区间端：-1 下限，1 上限
+    width = hi - lo
+
+    if fprime is not None:
+        x = np.where(active, 0.5 * (lo + hi) if x0 is None else np.clip(x0, lo, hi), x)
+        fx, dfx = f(x), fprime(x)
+        left = active & (np.sign(fx) == np.sign(f_lo))
+        right = active & ~left
+        lo, f_lo = np.where(left, x, lo), np.where(left, fx, f_lo)
+        hi, f_hi = np.where(right, x, hi), np.where(right, fx, f_hi)
+        active &= fx != 0
+
+    for _ in range(maxiter):
+        if not active.any():
+            break
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if fprime is None:
+                x_new = hi - f_hi * (hi - lo) / (f_hi - f_lo)       # 试位点
+            else:
+                x_new = x - fx / dfx        # 牛顿步
+        # 区间未有效缩小或迭代点越界时改用中点
+        slow = (hi - lo) > 0.5 * width
+        bad = ~np.isfinite(x_new) | (x_new <= lo) | (x_new >= hi)
+        bisect = slow | bad if fprime is None else bad
+        x_new = np.where(bisect, 0.5 * (lo + hi), x_new)
+        width = np.where(active, hi - lo, width)
+        x_prev = x
+        x = np.where(active, x_new, x)
+        fx = f(x)
+        if fprime is not None:
+            dfx = fprime(x)
+        iterations += active
+
+        left = active & (np.sign(fx) == np.sign(f_lo))
+        right = active & ~left
+        if fprime is None:
+            # Illinois 修正：同一端连续保留时将该端函数值减半
+            f_hi = np.where(left & (side == 1), 0.5 * f_hi, f_hi)
+            f_lo = np.where(right & (side == -1), 0.5 * f_lo, f_lo)
+        lo, f_lo = np.where(left, x, lo), np.where(left, fx, f_lo)
+        hi, f_hi = np.where(right, x, hi), np.where(right, fx, f_hi)
+        side = np.where(left, 1, np.where(right, -1, side))
+
+        done = (fx == 0) | (hi - lo <= xtol)
+        if fprime is not None:
+            done |= ~bisect & (np.abs(x - x_prev) <= xtol)
+        active &= ~done
+
+    converged = valid & ~active
+    return np.where(valid, x, np.nan), converged, iterations
+
+
+class RectangleCompressResult(NamedTuple):
+    """矩形截面偏心受压承载力计算结果"""
+    e0: float               # 截面偏心距，m
+    e: float                # 截面相对受拉钢筋偏心距，m
+    x: float                # 受压区高度，m
+    xi: float               # 相对受压区高度
+    type: str               # 'Large' 大偏心 / 'Small' 小偏心
+    n_resistance: float     # 轴向抗力，kN
+    m_resistance: float     # 对受拉钢筋合力点的抗弯承载力，kN.m
+    m_load: float           # 对受拉钢筋合力点的荷载弯矩，kN.m
+
+
+class CircularCompressResult(NamedTuple):
+    """圆形截面偏心受压承载力计算结果"""
+    e0: float               # 截面偏心距，m
+    cap_axes: float         # 轴心抗压承载力，kN
+    alpha: float            # 受压区圆心角比
+    nud: float              # 轴向抗力，kN
+    mud: float              # 抗弯承载力，kN.m
+    axial: bool             # 轴心抗压是否通过
+    passed: bool            # 偏心受压是否通过
+
+
+class RectangleBendResult(NamedTuple):
+    """矩形截面受弯承载力计算结果"""
+    x: float                        # 受压区高度，m
+    m_resistance: float             # 抗弯承载力，kN.m
+    safety: float                   # 安全系数
+    over_reinforced: bool           # 是否超筋（受压区高度取界限值）
+    compression_unyielded: bool     # 受压钢筋是否未屈服
+
+
+class ShearResult(NamedTuple):
+    """抗剪承载力计算结果"""
+    vc: float               # 混凝土（及箍筋）抗力，kN
+    vs: float               # 箍筋或弯起钢束抗力，kN
+    vr: float               # 抗剪承载力，kN
+    safety: float           # 安全系数
+
+
+class Envelope:
+    def __init__(self, e, n, m, n_axial=np.inf, shift=0, symmetric=False):
+        """
+        截面 N-M 相关曲线，以偏心距为序存储的多段线
+        :param e: 各采样点偏心距 m / n（m），按升序排列
+        :param n: 各采样点轴向抗力（kN）
+        :param m: 各采样点抗弯承载力（kN.m），与 e 同一力矩参考点
+        :param n_axial: 轴心抗压承载力（kN），默认不限制
+        :param shift: 由截面偏心距 md / nd 换算至 e 参考点的距离（m）
+        :param symmetric: 截面是否对称，对称时按弯矩绝对值计算
+        """
+        self.e = np.asarray(e, dtype=float)
+        self.n = np.asarray(n, dtype=float)
+        self.m = np.asarray(m, dtype=float)
+        self.n_axial = n_axial
+        self.shift = shift
+        self.symmetric = symmetric
+
+    @property
+    def polyline(self):
+        """相关曲线多段线坐标 (n, m)"""
+        return np.column_stack([self.n, self.m])
+
+    def n_resistance(self, nd, md):
+        """
+        按荷载偏心距在相关曲线上二分查找并插值得到轴向抗力（kN），nd <= 0 或偏心距小于首点
+        （超出相关曲线覆盖范围，如矩形截面受压钢筋一侧受拉）时为 nan
+        :param nd: 轴力数组（kN）
+        :param md: 弯矩数组（kN.m）
+        """
+        nd = np.asarray(nd, dtype=float)
+        md = np.abs(md) if self.symmetric else np.asarray(md, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            e = md / nd + self.shift
+            # 超出采样范围的大偏心按最后一点的抗弯承载力外推
+            n_res = np.where(e > self.e[-1], self.m[-1] / e, np.interp(e, self.e, self.n))
+        # 首点偏心距含舍入误差（圆形截面轴心受压时约为 0），留 1e-9 m 容差
+        return np.where((nd > 0) & (e >= self.e[0] - 1e-9), n_res, np.nan)
+
+    def utilization(self, nd, md, r=1.1):
+        """
+        批量计算利用率 r * nd / nud，不大于 1 时满足要求；为 nan 时组合超出相关曲线覆盖范围，应按不通过处理
+        :param nd: 基本组合下轴力数组（kN）
+        :param md: 基本组合下弯矩数组（kN.m）
+        :param r: 结构重要性系数，默认 1.1
+        """
+        nd = np.asarray(nd, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.maximum(r * nd / self.n_resistance(nd, md), r * nd / self.n_axial)
+
+    def save(self, path):
+        """
+        保存为 .npz 文件
+        :param path: 文件路径
+        """
+        np.savez(path, e=self.e, n=self.n, m=self.m, n_axial=self.n_axial, shift=self.shift, symmetric=self.symmetric)
+
+    @classmethod
+    def load(cls, path):
+        """
+        读取 save 保存的 .npz 文件
+        :param path: 文件路径
+        :return: Envelope
+        """
+        with np.load(path) as data:
+            return cls(data['e'], data['n'], data['m'], float(data['n_axial']), float(data['shift']),
+                       bool(data['symmetric']))
+
+
+def save_envelopes(path, envelopes):
+    """
+    将多个截面的相关曲线保存至同一个 .npz 文件
+    :param path: 文件路径
+    :param envelopes: {截面名称: Envelope}
+    """
+    data = {}
+    for name, env in envelopes.items():
+        data.update({f'{name}/e': env.e, f'{name}/n': env.n, f'{name}/m': env.m,
+                     f'{name}/info': np.array([env.n_axial, env.shift, env.symmetric], dtype=float)})
+    np.savez(path, **data)
+
+
+def load_envelopes(path):
+    """
+    读取 save_envelopes 保存的 .npz 文件
+    :param path: 文件路径
+    :return: {截面名称: Envelope}
+    """
+    envelopes = {}
+    with np.load(path) as data:
+        for key in data.files:
+            name, field = key.rsplit('/', 1)
+            if field == 'info':
+                n_axial, shift, symmetric = data[key]
+                envelopes[name] = Envelope(data[f'{name}/e'], data[f'{name}/n'], data[f'{name}/m'],
+                                           n_axial, shift, bool(symmetric))
+    return envelopes
+
+
 class RectangleCompress:
     def __init__(self, b, h, ad1, ad2, anum1, anum2, fcd, fsd1, fsd2, a1, a2):
         """
@@ -41,28 +305,43 @@ class RectangleCompress:
         self.xi_b = 0.49  # 相对界限受压区高度
         self.h0 = h - a1  # 截面有效高度
 
-    # noinspection PyAttributeOutsideInit
-    def capacity(self, nd, md, r=1.1):
-        self.e0 = md / nd  # 截面偏心距
-        self.e = self.e0 + self.h / 2 - self.a1  # 截面相对受拉钢筋偏心距
-        self.m_load = r * nd * self.e
-
-        def nud_cal(x):
-            sig_s = 0.0033 * 2e5 * (0.8 * self.h0 / x - 1) if x > self.xi_b * self.h0 else self.fsd1
-            sig_s2 = self.fcd * 2e5 / 3.45e4 if x < 2 * self.a2 else self.fsd2
-            nud = self.fcd * self.b * x * 1e3 + sig_s2 * self.as2 / 1e3 - sig_s * self.as1 / 1e3
-            return nud
-
-        def mud_cal(x):
-            sig_s2 = self.fcd * 2e5 / 3.45e4 if x < 2 * self.a2 else self.fsd2
-            mud = self.fcd * self.b * x * (self.h0 - x / 2) * 1e3
-            mud += sig_s2 * self.as2 * (self.h0 - self.a2) / 1e3
-            return mud
+    def nud_cal(self, x):
+        """
+        受压区高度 x 对应的轴向抗力（kN），x 可为数组
+        :param x: 受压区高度，m
+        """
+        x = np.asarray(x, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sig_s = np.where(x > self.xi_b * self.h0, 0.0033 * 2e5 * (0.8 * self.h0 / x - 1), self.fsd1)
+        sig_s2 = np.where(x < 2 * self.a2, self.fcd * 2e5 / 3.45e4, self.fsd2)
+        return self.fcd * self.b * x * 1e3 + sig_s2 * self.as2 / 1e3 - sig_s * self.as1 / 1e3
+
+    def mud_cal(self, x):
+        """
+        受压区高度 x 对应的对受拉钢筋合力点的抗弯承载力（kN.m），x 可为数组
+        :param x: 受压区高度，m
+        """
+        x = np.asarray(x, dtype=float)
+        sig_s2 = np.where(x < 2 * self.a2, self.fcd * 2e5 / 3.45e4, self.fsd2)
+        mud = self.fcd * self.b * x * (self.h0 - x / 2) * 1e3
+        return mud + sig_s2 * self.as2 * (self.h0 - self.a2) / 1e3
+
+    def evaluate(self, nd, md, r=1.1):
+        """
+        计算截面承载力，不修改实例属性，可在多线程或多进程中共享同一截面
+        :param nd: 基本组合下轴力（kN）
+        :param md: 基本组合下弯矩（kN.m）
+        :param r: 结构重要性系数，默认 1.1
+        :return: RectangleCompressResult
+        """
+        e0 = md / nd  # 截面偏心距
+        e = e0 + self.h / 2 - self.a1  # 截面相对受拉钢筋偏心距
 
         def e0_cal(x):
-            return mud_cal(x) - self.e * nud_cal(x)
+            return float(self.mud_cal(x)) - e * float(self.nud_cal(x))
 
-        self.x = optimize.brentq(e0_cal, 0, self.h0 * 2)
+        x = optimize.brentq(e0_cal, 0, self.h0 * 2)
+        x = float(self._settle(x, e, True)[0])  # 根落在受压钢筋应力突变处时取偏安全一侧
         # self.x_all = optimize.root(e0_cal, 0.5 * self.h0).x
         # self.x = self.x_all.x[0]
 
@@ -70,15 +349,135 @@ class RectangleCompress:
         # self.x = sympy.solve(r * nd * 1e3 - self.fcd * self.b * x * 1e6 -
         #                      self.fsd2 * self.as2 + self.fsd1 * self.as1, x)[0]
 
-        self.xi = self.x / self.h0  # 截面相对受压区高度
-        self.type = 'Large' if self.xi <= self.xi_b else 'Small'
-        self.n_resistance = nud_cal(self.x)
-        self.m_resistance = mud_cal(self.x)
+        xi = x / self.h0  # 截面相对受压区高度
         # self.m_resistance = self.fcd * self.b * self.x * (self.h0 - self.x / 2) * 1e3 + \
         #                     self.fsd2 * self.as2 * (self.h0 - self.a2) / 1e3
+        return RectangleCompressResult(e0, e, x, xi, 'Large' if xi <= self.xi_b else 'Small',
+                                       float(self.nud_cal(x)), float(self.mud_cal(x)), r * nd * e)
+
+    # noinspection PyAttributeOutsideInit
+    def capacity(self, nd, md, r=1.1):
+        res = self.evaluate(nd, md, r)
+        self.e0 = res.e0
+        self.e = res.e
+        self.m_load = res.m_load
+        self.x = res.x
+        self.xi = res.xi
+        self.type = res.type
+        self.n_resistance = res.n_resistance
+        self.m_resistance = res.m_resistance
 
         return self.m_load, self.m_resistance
 
+    def capacity_batch(self, nd, md, r=1.1):
+        """
+        批量计算多组内力下的截面承载力，不修改实例属性
+        :param nd: 基本组合下轴力数组（kN），可为 DataFrame 的列
+        :param md: 基本组合下弯矩数组（kN.m）
+        :param r: 结构重要性系数，默认 1.1
+        :return: DataFrame，列为 x, xi, type, n_resistance, m_resistance, m_load, converged
+        """
+        index = nd.index if isinstance(nd, pd.Series) else None
+        nd = np.asarray(nd, dtype=float)
+        md = np.asarray(md, dtype=float)
+        e = md / nd + self.h / 2 - self.a1  # 截面相对受拉钢筋偏心距
+
+        x, converged, _ = bracket_root(lambda t: self.mud_cal(t) - e * self.nud_cal(t),
+                                       np.zeros_like(e), np.full_like(e, self.h0 * 2))
+        x, converged = self._settle(x, e, converged)
+        xi = x / self.h0
+
+        return pd.DataFrame({
+            'x': x,
+            'xi': xi,
+            'type': np.where(xi <= self.xi_b, 'Large', 'Small'),
+            'n_resistance': self.nud_cal(x),
+            'm_resistance': self.mud_cal(x),
+            'm_load': r * nd * e,
+            'converged': converged,
+        }, index=index)
+
+    def _settle(self, x, e, converged):
+        """
+        检查求根结果：受压钢筋应力在 x = 2 * a2 处突变，偏心距落在突变两侧之间时根停在突变点上，
+        抗力偏安全地取突变点左侧（受压钢筋未屈服）的值，同 rectangle_envelope；其余残差不为零的根视为未收敛
+        :param x: 受压区高度数组
+        :param e: 截面相对受拉钢筋偏心距数组
+        :param converged: 求根是否收敛
+        :return: 受压区高度, 是否收敛
+        """
+        def small(t):
+            # 残差折算为轴力（kN），与截面轴压承载力量级比较，纯弯附近偏心距很大时不致误判
+            residual = np.abs(self.mud_cal(t) - e * self.nud_cal(t)) / (np.abs(e) + self.h0)
+            return residual <= 1e-6 * self.fcd * self.b * self.h * 1e3
+
+        ok = small(x)
+        jump = converged & ~ok & (np.abs(x - 2 * self.a2) <= 1e-8)
+        x = np.where(jump, 2 * self.a2 - 1e-9, x)
+        return x, converged & (ok | jump)
+
+    def capacity_sweep(self, nd, md, r=1.1, warm=True):
+        """
+        按偏心距排序后逐个求解多组内力，以上一组的受压区高度热启动
+        :param nd: 基本组合下轴力数组（kN）
+        :param md: 基本组合下弯矩数组（kN.m）
+        :param r: 结构重要性系数，默认 1.1
+        :param warm: 是否热启动，False 时每组均在 [0, 2 * h0] 内求解，用于对比求解次数
+        :return: DataFrame（按输入顺序），列同 capacity_batch 并增加 iterations
+        """
+        index = nd.index if isinstance(nd, pd.Series) else None
+        nd = np.asarray(nd, dtype=float)
+        md = np.asarray(md, dtype=float)
+        e = md / nd + self.h / 2 - self.a1  # 截面相对受拉钢筋偏心距
+        order = np.argsort(e)
+
+        x = np.full(len(e), np.nan)
+        iterations = np.zeros(len(e), dtype=int)
+        converged = np.zeros(len(e), dtype=bool)
+        x[order], iterations[order], converged[order] = warm_sweep(
+            lambda t, ei: float(self.mud_cal(t)) - ei * float(self.nud_cal(t)), e[order], 0, self.h0 * 2, warm,
+            1e-3 * self.h0)
+        x, converged = self._settle(x, e, converged)
+        xi = x / self.h0
+
+        return pd.DataFrame({
+            'x': x,
+            'xi': xi,
+            'type': np.where(xi <= self.xi_b, 'Large', 'Small'),
+            'n_resistance': self.nud_cal(x),
+            'm_resistance': self.mud_cal(x),
+            'm_load': r * nd * e,
+            'converged': converged,
+            'iterations': iterations,
+        }, index=index)
+
+    def envelope(self, num=4000):
+        """
+        截面 N-M 相关曲线（按截面参数缓存，重复调用不再计算）
+        :param num: 受压区高度采样点数
+        :return: Envelope
+        """
+        return rectangle_envelope(self.b, self.h, self.ad1, self.ad2, self.anum1, self.anum2,
+                                  self.fcd, self.fsd1, self.fsd2, self.a1, self.a2, num)
+
+    def biaxial_surface(self, size=0.05, n_theta=72, n_c=200, n_n=100):
+        """
+        双向偏压破坏面（纤维法），受拉、受压钢筋分别沿截面宽度均布成排
+        :param size: 混凝土纤维尺寸（m）
+        :param n_theta: 中性轴方向采样数
+        :param n_c: 每个方向的受压区高度采样数
+        :param n_n: 轴力分层数
+        :return: fiber.BiaxialSurface，m_y 与单向弯矩 md 同向（受压钢筋一侧受压），m_z 为沿宽度方向的弯矩
+        """
+        import fiber
+
+        b, h = self.b, self.h
+        bars = [np.r_[i, j] for i, j in zip(fiber.row_bars(self.anum1, self.ad1, -h / 2 + self.a1, b, self.a1),
+                                            fiber.row_bars(self.anum2, self.ad2, h / 2 - self.a2, b, self.a2))]
+        sec = fiber.FiberSection.from_polygon([(-b / 2, -h / 2), (b / 2, -h / 2), (b / 2, h / 2), (-b / 2, h / 2)],
+                                              size=size, fcd=self.fcd, bars=bars, fsd1=self.fsd1, fsd2=self.fsd2)
+        return fiber.BiaxialSurface.from_fiber(sec, n_theta, n_c, n_n)
+
     # noinspection PyAttributeOutsideInit
     def crack_width(self, ns, ms, es=2e5, rebar=36):
         c1 = 1
@@ -96,6 +495,160 @@ class RectangleCompress:
             self.wcr = c1 * c2 * c3 * self.sigma_ss / es * ((self.a1 - rebar / 2000) + rebar) / (0.3 + 1.4 * pte)
         return self.wcr
 
+    def crack_width_batch(self, ns, ms, es=2e5, rebar=36):
+        """
+        批量计算频遇组合下的裂缝宽度，不修改实例属性
+        :param ns: 频遇组合轴力数组（kN）
+        :param ms: 频遇组合弯矩数组（kN.m）
+        :param es: 钢筋弹性模量（MPa）
+        :param rebar: 受拉钢筋直径（mm）
+        :return: 裂缝宽度数组（mm），偏心距不大于 0.55h 时为 0
+        """
+        ns = np.asarray(ns, dtype=float)
+        ms = np.asarray(ms, dtype=float)
+        c1 = 1
+        c2 = 1.5 * 0.9
+        c3 = 0.9
+        e0s = ms / ns  # 频遇组合下偏心距
+        check = e0s > 0.55 * self.h
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            e_s = e0s + self.h / 2 - self.a1
+            z = (0.87 - 0.12 * (self.h0 / e_s) ** 2) * self.h0
+            sigma_ss = ns * (e_s - z) / (self.as1 * z) * 1000
+        pte = min(self.as1 / (2 * self.a1 * self.b) / 1e6, 0.1)
+        wcr = c1 * c2 * c3 * sigma_ss / es * ((self.a1 - rebar / 2000) + rebar) / (0.3 + 1.4 * pte)
+        return np.where(check, wcr, 0)
+
+
+@functools.lru_cache(maxsize=256)
+def rectangle_envelope(b, h, ad1, ad2, anum1, anum2, fcd, fsd1, fsd2, a1, a2, num=4000):
+    """
+    生成并缓存矩形截面的 N-M 相关曲线，参数同 RectangleCompress
+    :param num: 受压区高度采样点数，在 (0, 2 * h0] 内采样，覆盖大、小偏心受压
+    :return: Envelope，偏心距与弯矩均以受拉钢筋合力点为参考点
+    """
+    sec = RectangleCompress(b, h, ad1, ad2, anum1, anum2, fcd, fsd1, fsd2, a1, a2)
+    # 均匀采样，并在轴力为零（纯弯）附近按几何级数加密
+    x_0, _, _ = bracket_root(sec.nud_cal, 0, 2 * sec.h0)
+    x = np.union1d(np.linspace(0, 2 * sec.h0, num // 2 + 1)[1:],
+                   x_0 + (2 * sec.h0 - x_0) * np.geomspace(1e-6, 1, num // 2))
+    x = np.union1d(x, [2 * a2 - 1e-9, 2 * a2])
+    nud, mud = sec.nud_cal(x), sec.mud_cal(x)
+    x, nud, mud = x[nud > 0], nud[nud > 0], mud[nud > 0]
+    e = mud / nud
+    # 界限受压区高度处应力突变使偏心距局部不单调，仅保留严格递减的采样点
+    keep = np.r_[True, e[1:] < np.minimum.accumulate(e)[:-1]]
+    e, nud, mud = e[keep], nud[keep], mud[keep]
+
+    # 受压钢筋应力在 x = 2 * a2 处突变，偏心距落在突变两侧之间时求根结果停在突变点上，
+    # 抗力偏安全地取突变点左侧（受压钢筋未屈服）的值
+    n_left, n_right = sec.nud_cal(2 * a2 - 1e-9), sec.nud_cal(2 * a2)
+    if 0 < n_left < n_right:
+        e_right = sec.mud_cal(2 * a2) / n_right * (1 + 1e-9)
+        e, nud, mud = np.r_[e, e_right], np.r_[nud, n_left], np.r_[mud, n_left * e_right]
+    order = np.argsort(e)
+    return Envelope(e[order], nud[order], mud[order], shift=h / 2 - a1)
+
+
+def circular_force(alpha, fcd, a, d, fsd, As, rs, derivative=False):
+    """
+    圆形截面受压区圆心角比 alpha 对应的抗力，各参数均可为可广播的数组
+    :param alpha: 受压区混凝土截面面积的圆心角（rad）与 2π 的比值
+    :param fcd: 混凝土抗压强度设计值（MPa）
+    :param a: 截面面积（m2）
+    :param d: 截面直径（m）
+    :param fsd: 钢筋抗拉强度设计值（MPa）
+    :param As: 纵向钢筋面积（mm2）
+    :param rs: 钢筋布置半径（m）
+    :param derivative: 是否同时返回对 alpha 的导数
+    :return: 轴向抗力 nud（kN）、抗弯承载力 mud（kN.m），以及可选的 dnud、dmud
+    """
+    alpha = np.asarray(alpha, dtype=float)
+    tension = alpha <= 0.625
+    alpha_t = np.where(tension, 1.25 - 2 * alpha, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        nud = alpha * fcd * a * (1 - np.sin(2 * np.pi * alpha) / (2 * np.pi * alpha)) * 1e3
+    nud = np.where(alpha > 0, nud, 0) + (alpha - alpha_t) * fsd * As / 1e3
+    mud = 2 / 3 * fcd * a * d / 2 * (np.sin(alpha * np.pi) ** 3) / np.pi * 1e3
+    mud = mud + fsd * As * rs / 2 * (np.sin(alpha * np.pi) + np.sin(np.pi * alpha_t)) / np.pi / 1e3
+    if not derivative:
+        return nud, mud
+
+    dalpha_t = np.where(tension, -2, 0)
+    dnud = fcd * a * (1 - np.cos(2 * np.pi * alpha)) * 1e3 + (1 - dalpha_t) * fsd * As / 1e3
+    dmud = fcd * a * d * np.sin(alpha * np.pi) ** 2 * np.cos(alpha * np.pi) * 1e3
+    dmud = dmud + fsd * As * rs / 2 * (np.cos(alpha * np.pi) + np.cos(np.pi * alpha_t) * dalpha_t) / 1e3
+    return nud, mud, dnud, dmud
+
+
+def circular_capacity_grid(secs, nd, md, r=1.1, xtol=1e-10, maxiter=50):
+    """
+    批量计算多个圆形截面在多组内力下的承载力
+    :param secs: CircularCompress 截面列表，长度 n_sections
+    :param nd: 基本组合下轴力（kN），形状为 (n_loads,) 或 (n_sections, n_loads)
+    :param md: 基本组合下弯矩（kN.m），形状同 nd，按绝对值计算
+    :param r: 结构重要性系数，默认 1.1
+    :param xtol: alpha 收敛容差
+    :param maxiter: 最大迭代次数
+    :return: (n_sections, n_loads) 结构化数组，字段为
+        alpha, nud, mud, iterations, converged（是否收敛）, axial（轴心抗压是否通过）, passed（是否通过）
+    """
+    def column(name):
+        return np.array([getattr(i, name) for i in secs], dtype=float)[:, None]
+
+    fcd, a, d, fsd1, fsd2, As, rs = [column(i) for i in ('fcd', 'a', 'd', 'fsd1', 'fsd2', 'As', 'rs')]
+    nd, md = np.broadcast_arrays(np.atleast_2d(np.asarray(nd, dtype=float)), np.atleast_2d(np.asarray(md, dtype=float)))
+    nd, md = np.broadcast_arrays(nd, md, fcd)[:2]
+
+    # 截面轴力为零时的 alpha 作为求解区间下限，其上偏心距 mud / nud 随 alpha 单调减小
+    alpha_0, _, _ = bracket_root(lambda t: circular_force(t, fcd, a, d, fsd1, As, rs)[0],
+                                 np.zeros_like(fcd), np.ones_like(fcd), xtol=xtol)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        e0 = np.maximum(np.abs(md) / nd, 1e-9)
+    e0 = np.where(nd > 0, e0, np.nan)
+
+    def e0_cal(t):
+        nud, mud = circular_force(t, fcd, a, d, fsd1, As, rs)
+        return mud - e0 * nud
+
+    def e0_prime(t):
+        dnud, dmud = circular_force(t, fcd, a, d, fsd1, As, rs, derivative=True)[2:]
+        return dmud - e0 * dnud
+
+    alpha, converged, iterations = bracket_root(e0_cal, np.broadcast_to(alpha_0, nd.shape), np.ones_like(nd),
+                                                fprime=e0_prime, xtol=xtol, maxiter=maxiter)
+    nud, mud = circular_force(alpha, fcd, a, d, fsd1, As, rs)
+    cap_axes = 0.9 * (fcd * a * 1e6 + As * fsd2) / 1000
+    axial = cap_axes >= r * nd
+
+    result = np.zeros(nd.shape, dtype=[('alpha', float), ('nud', float), ('mud', float), ('iterations', int),
+                                       ('converged', bool), ('axial', bool), ('passed', bool)])
+    result['alpha'] = alpha
+    result['nud'] = nud
+    result['mud'] = mud
+    result['iterations'] = iterations
+    result['converged'] = converged
+    result['axial'] = axial
+    result['passed'] = converged & axial & (nud >= r * nd)
+    return result
+
+
+@functools.lru_cache(maxsize=256)
+def circular_envelope(d, anum, ad, fcd, fsd1, fsd2, c=50, hoop=12, num=2000):
+    """
+    生成并缓存圆形截面的 N-M 相关曲线，参数同 CircularCompress
+    :param num: alpha 采样点数
+    :return: Envelope
+    """
+    sec = CircularCompress(d, anum, ad, fcd, fsd1, fsd2, c, hoop)
+    alpha_0, _, _ = bracket_root(lambda t: circular_force(t, fcd, sec.a, d, fsd1, sec.As, sec.rs)[0], 0, 1)
+    # 纯弯附近偏心距变化剧烈，采样点向 alpha_0 加密
+    alpha = alpha_0 + (1 - alpha_0) * np.geomspace(1e-6, 1, num)
+    nud, mud = circular_force(alpha, fcd, sec.a, d, fsd1, sec.As, sec.rs)
+    cap_axes = 0.9 * (fcd * sec.a * 1e6 + sec.As * fsd2) / 1000
+    return Envelope((mud / nud)[::-1], nud[::-1], mud[::-1], n_axial=cap_axes, symmetric=True)
+
 
 class CircularCompress:
     def __init__(self, d, anum, ad, fcd, fsd1, fsd2, c=50, hoop=12):
@@ -144,38 +697,93 @@ class CircularCompress:
         :param r: 结构重要性系数，默认 1.1
         :return:
         """
-        self.cap_axes = 0.9 * (self.fcd * self.a * 1e6 + self.As * self.fsd2) / 1000
-        if self.cap_axes < r * nd:
+        res = self.evaluate(nd, md, r)
+        self.cap_axes = res.cap_axes
+        if not res.axial:
             print('轴心抗压承载力无法通过！')
             raise Exception
 
-        self.e0 = md / nd
-
-        # alpha = 0
-        # alpha_t = 0
-
-        def nud_cal(alpha):
-            alpha_t = 0 if alpha > 0.625 else (1.25 - 2 * alpha)
-            nud = alpha * self.fcd * self.a * (1 - np.sin(2 * np.pi * alpha) / (2 * np.pi * alpha)) * 1e3
-            nud += (alpha - alpha_t) * self.fsd1 * self.As / 1e3
-            return nud
-        
-        def mud_cal(alpha):
-            alpha_t = 0 if alpha > 0.625 else (1.25 - 2 * alpha)
-            mud = 2 / 3 * self.fcd * self.a * self.d / 2 * (np.sin(alpha * np.pi) ** 3) / np.pi * 1e3
-            mud += self.fsd1 * self.As * self.rs / 2 * (np.sin(alpha * np.pi) + np.sin(np.pi * alpha_t)) / np.pi / 1e3
-            return mud
-        
+        self.e0 = res.e0
+        self.alpha = res.alpha
+        self.nud = res.nud
+        self.mud = res.mud
+        if not res.passed:
+            print('计算不通过！')
+            print(res.alpha)
+
+    def evaluate(self, nd, md, r=1.1):
+        """
+        计算截面承载力，不修改实例属性，可在多线程或多进程中共享同一截面
+        :param nd: 基本组合下轴力（kN）
+        :param md: 基本组合下弯矩（kN.m)
+        :param r: 结构重要性系数，默认 1.1
+        :return: CircularCompressResult，轴心抗压不通过时 alpha、nud、mud 为 nan
+        """
+        cap_axes = 0.9 * (self.fcd * self.a * 1e6 + self.As * self.fsd2) / 1000
+        e0 = md / nd
+        if cap_axes < r * nd:
+            return CircularCompressResult(e0, cap_axes, np.nan, np.nan, np.nan, False, False)
+
         def e0_cal(alpha):
-            return mud_cal(alpha) - self.e0 * nud_cal(alpha)
-        
+            nud, mud = circular_force(alpha, self.fcd, self.a, self.d, self.fsd1, self.As, self.rs)
+            return mud - e0 * nud
+
         alpha = optimize.root(e0_cal, 0.5).x[0]
-        self.alpha = alpha
-        self.nud = nud_cal(alpha)
-        self.mud = mud_cal(alpha)
-        if self.nud < r * nd:
-            print('计算不通过！')
-            print(alpha)
+        nud, mud = circular_force(alpha, self.fcd, self.a, self.d, self.fsd1, self.As, self.rs)
+        return CircularCompressResult(e0, cap_axes, alpha, float(nud), float(mud), True, bool(nud >= r * nd))
+
+    def capacity_sweep(self, nd, md, r=1.1, warm=True):
+        """
+        按偏心距排序后逐个求解多组内力，以上一组的 alpha 热启动
+        :param nd: 基本组合下轴力数组（kN）
+        :param md: 基本组合下弯矩数组（kN.m），按绝对值计算
+        :param r: 结构重要性系数，默认 1.1
+        :param warm: 是否热启动，False 时每组均在 [alpha_0, 1] 内求解，用于对比求解次数
+        :return: DataFrame（按输入顺序），列为 alpha, nud, mud, iterations, converged, axial, passed；
+            轴力不大于 0 的组合 alpha, nud, mud 为 nan，不收敛且不通过
+        """
+        index = nd.index if isinstance(nd, pd.Series) else None
+        nd = np.asarray(nd, dtype=float)
+        md = np.asarray(md, dtype=float)
+        # 轴力不大于 0 的组合不在求解范围内，结果为 nan 且不通过，同 circular_capacity_grid
+        compress = np.flatnonzero(nd > 0)
+        e0 = np.maximum(np.abs(md[compress]) / nd[compress], 1e-9)
+        order = compress[np.argsort(e0)]
+
+        def force(alpha):
+            return circular_force(alpha, self.fcd, self.a, self.d, self.fsd1, self.As, self.rs)
+
+        def e0_cal(t, e):
+            nud, mud = force(t)
+            return float(mud - e * nud)
+
+        # 轴力为零时的 alpha 为求解区间下限
+        alpha_0 = optimize.brentq(lambda t: float(force(t)[0]), 0, 1)
+        alpha = np.full(len(nd), np.nan)
+        iterations = np.zeros(len(nd), dtype=int)
+        converged = np.zeros(len(nd), dtype=bool)
+        alpha[order], iterations[order], converged[order] = warm_sweep(
+            e0_cal, np.sort(e0), alpha_0, 1, warm)
+
+        nud, mud = force(alpha)
+        cap_axes = 0.9 * (self.fcd * self.a * 1e6 + self.As * self.fsd2) / 1000
+        return pd.DataFrame({
+            'alpha': alpha,
+            'nud': nud,
+            'mud': mud,
+            'iterations': iterations,
+            'converged': converged,
+            'axial': cap_axes >= r * nd,
+            'passed': converged & (cap_axes >= r * nd) & (nud >= r * nd),
+        }, index=index)
+
+    def envelope(self, num=2000):
+        """
+        截面 N-M 相关曲线（按截面参数缓存，重复调用不再计算）
+        :param num: alpha 采样点数
+        :return: Envelope
+        """
+        return circular_envelope(self.d, self.anum, self.ad, self.fcd, self.fsd1, self.fsd2, self.c, self.hoop, num)
 
     def crack_width(self, ns, ms):
         """
@@ -195,7 +803,7 @@ class CircularCompress:
 
         if e0 <= 0.55 * self.r:     # 是否需要验算裂缝
             self.wcr = 0
-            return
+            return self.wcr
 
         rho = self.As / 1e6 / (np.pi * self.r ** 2)     # 配筋率
         beta = (0.4 + 2.5 * rho) * (1 + 0.353 * (e0 / self.r) ** -2)
@@ -211,6 +819,37 @@ class CircularCompress:
 
         return self.wcr
 
+    def crack_width_batch(self, ns, ms):
+        """
+        批量计算裂缝宽度，不修改实例属性
+        :param ns: 短期组合轴力数组（kN)
+        :param ms: 短期组合弯矩数组 (kN.m)
+        :return: 裂缝计算宽度数组 (mm)，偏心距不大于 0.55r 时为 0
+        """
+        ns = np.asarray(ns, dtype=float)
+        ms = np.asarray(ms, dtype=float)
+        c1 = 1
+        c2 = 1.5 * 0.9
+        c3 = 0.9
+
+        es = self.r - self.rs        # 纵向钢筋到边缘距离
+        rs = self.r - es     # 钢筋布置半径
+        e0 = ms / ns        # 截面偏心距
+        check = e0 > 0.55 * self.r      # 需要验算裂缝的组合
+
+        rho = self.As / 1e6 / (np.pi * self.r ** 2)     # 配筋率
+        r1 = self.r - 2 * es
+        with np.errstate(divide='ignore', invalid='ignore'):
+            beta = (0.4 + 2.5 * rho) * (1 + 0.353 * (e0 / self.r) ** -2)
+            rho_te = beta * self.As / 1e6 / (np.pi * (self.r ** 2 - r1 ** 2))     # 有效配筋率
+            n_s = 1 + 1 / (4000 * e0 / (2 * self.r - es / 1e3)) * (20 / self.d) ** 2
+            sigma_ss = 0.6 * (e0 / self.r - 0.1) ** 3 / ((0.45 + 0.26 * rs / self.r) * (n_s * e0 / self.r + 0.2) ** 2)
+            sigma_ss *= ns * 1e3 / self.As
+
+        c = min(self.cs, 50)
+        wcr = c1 * c2 * c3 * sigma_ss / self.Es * (c + self.ad / 2) / (0.36 + 1.7 * rho_te)
+        return np.where(check, wcr, 0)
+
     def shear_capacity(self, fc1, sk, vc0, fyh=0):
         """
         计算抗剪承载力
@@ -220,16 +859,50 @@ class CircularCompress:
         :param fyh：箍筋抗拉强度设计值（MPa，默认为主筋强度）
         :return:
         """
+        res = self.evaluate_shear(fc1, sk, vc0, fyh)
+        self.vr = res.vr
+
+        return res.safety
+
+    def evaluate_shear(self, fc1, sk, vc0, fyh=0):
+        """
+        计算抗剪承载力，不修改实例属性，参数同 shear_capacity
+        :return: ShearResult
+        """
+        vc, vs_unit, vs_max = self._shear_terms(fc1, fyh)
+        vs = min(vs_unit / sk, vs_max)
+        vr = vc + vs
+        return ShearResult(vc, vs, vr, abs(vr / vc0))
+
+    def _shear_terms(self, fc1, fyh=0):
+        """
+        抗剪承载力各项，箍筋间距为 sk 时箍筋抗力为 min(vs_unit / sk, vs_max)
+        :return: 混凝土抗力 vc（kN）、单位间距箍筋抗力 vs_unit（kN.mm）、箍筋抗力上限 vs_max（kN）
+        """
         fyh = fyh if fyh != 0 else self.fsd1
         de = self.d - (self.c + 0.5 * self.hoop) / 1e3      # 核心混凝土直径（m）
         ae = (de / 2) ** 2 * np.pi * 1e4                    # 核心混凝土面积（cm2）
         vc = 0.0023 * fc1 ** 0.5 * ae                       # 混凝土抗力（kN）
         ak = (self.hoop / 2) ** 2 * np.pi * 2 / 1e2         # 同一截面上箍筋面积（cm2）
-        vs = min(0.1 * ak * (0.9 * self.d * 1e2) * fyh / (sk / 10), 0.067 * fc1 ** 0.5 * ae)
-        self.vr = vc + vs
-        safe = abs(self.vr / vc0)
+        return vc, 0.1 * ak * (0.9 * self.d * 1e2) * fyh * 10, 0.067 * fc1 ** 0.5 * ae
 
-        return safe
+    def stirrup_spacing(self, fc1, vc0, fyh=0, step=10, s_min=100, s_max=400):
+        """
+        按剪力设计值反算最大箍筋间距（箍筋抗力与间距成反比），可沿构件批量计算
+        :param fc1: 混凝土抗压强度标准值（MPa）
+        :param vc0: 剪力设计值数组（kN）
+        :param fyh: 箍筋抗拉强度设计值（MPa，默认为主筋强度）
+        :param step: 间距取整模数（mm），向下取整
+        :param s_min: 最小施工间距（mm）
+        :param s_max: 构造最大间距（mm）
+        :return: 箍筋间距数组（mm），箍筋抗力达到上限仍不满足或小于 s_min 时为 nan
+        """
+        vc0 = np.abs(np.asarray(vc0, dtype=float))
+        vc, vs_unit, vs_max = self._shear_terms(fc1, fyh)
+        vs = vc0 - vc                                       # 箍筋需承担的剪力（kN）
+        with np.errstate(divide='ignore'):
+            sk = np.where(vs > 0, vs_unit / vs, np.inf)
+        return snap_spacing(np.where(vs <= vs_max, sk, np.nan), step, s_min, s_max)
 
 
 class RectangleBend:
@@ -286,29 +959,336 @@ class RectangleBend:
         :param md: 弯矩设计值，kN.m
         :return: 安全系数
         """
-        self.x = (self.fsd1 * self.as1 + self.fpd * self.ap - self.fsd2 * self.as2) / 1e6 / (self.fcd * self.b)
-        if self.x > self.xi_b * self.h0:
+        res = self.evaluate(md)
+        if res.over_reinforced:
             print('超筋破坏')
             # raise Exception
-            self.x = self.xi_b * self.h0
-        if self.x < 2 * self.aa / 1e3:
+        if res.compression_unyielded:
             print('受压钢筋未屈服')
-            self.m_resistance = self.fpd * self.ap * (self.h0 - 0.25) / 1e3
-            self.m_resistance += self.fsd1 * self.as1 * (self.h0 - self.aa / 1e3) / 1e3
+        self.x = res.x
+        self.m_resistance = res.m_resistance
+        return res.safety
+
+    def evaluate(self, md=1):
+        """
+        计算抗弯承载力，不修改实例属性，可在多线程或多进程中共享同一截面
+        :param md: 弯矩设计值，kN.m
+        :return: RectangleBendResult
+        """
+        x = (self.fsd1 * self.as1 + self.fpd * self.ap - self.fsd2 * self.as2) / 1e6 / (self.fcd * self.b)
+        over_reinforced = x > self.xi_b * self.h0
+        if over_reinforced:
+            x = self.xi_b * self.h0
+        compression_unyielded = x < 2 * self.aa / 1e3
+        if compression_unyielded:
+            m_resistance = self.fpd * self.ap * (self.h0 - 0.25) / 1e3
+            m_resistance += self.fsd1 * self.as1 * (self.h0 - self.aa / 1e3) / 1e3
         else:
-            self.m_resistance = self.fcd * self.b * self.x * (self.h0 - self.x) * 1e3
-            self.m_resistance += self.fsd2 * self.as2 * (self.h0 - self.aa / 1e3) / 1e3
-        return self.m_resistance / md
+            m_resistance = self.fcd * self.b * x * (self.h0 - x) * 1e3
+            m_resistance += self.fsd2 * self.as2 * (self.h0 - self.aa / 1e3) / 1e3
+        return RectangleBendResult(x, m_resistance, m_resistance / md, over_reinforced, compression_unyielded)
 
     def shear_capacity(self, vd=1, space_sv=100, fcuk=50, fsv=330, num_sv=1, p_theta=0):
+        res = self.evaluate_shear(vd, space_sv, fcuk, fsv, num_sv, p_theta)
+        self.vcs = res.vc
+        self.vpd = res.vs
+        self.vr = res.vr
+        return res.safety
+
+    def evaluate_shear(self, vd=1, space_sv=100, fcuk=50, fsv=330, num_sv=1, p_theta=0):
+        """
+        计算抗剪承载力，不修改实例属性，参数同 shear_capacity
+        :return: ShearResult，vc 为混凝土与箍筋抗力 vcs，vs 为预应力弯起钢束抗力 vpd
+        """
         psv = get_as(self.hoop, 2) * num_sv / (space_sv * self.b * 1e3)
         a_2 = 1.25 if self.pnum != 0 else 1
         p = (self.as1 + self.ap) / (self.b * self.h0) / 1e6 * 100
         p = min(p, 2.5)
-        self.vcs = 0.45 * 1e-3 * a_2 * self.b * self.h0 * 1e6 * ((2 + 0.6 * p) * fcuk ** 0.5 * (psv * fsv)) ** 0.5
-        self.vpd = 0.75 * 1e-3 * self.fpd * self.ap * np.sin(p_theta * np.pi / 180)
-        self.vr = self.vcs + self.vpd
-        return self.vr / vd
+        vcs = 0.45 * 1e-3 * a_2 * self.b * self.h0 * 1e6 * ((2 + 0.6 * p) * fcuk ** 0.5 * (psv * fsv)) ** 0.5
+        vpd = 0.75 * 1e-3 * self.fpd * self.ap * np.sin(p_theta * np.pi / 180)
+        return ShearResult(vcs, vpd, vcs + vpd, (vcs + vpd) / vd)
+
+    def stirrup_spacing(self, vd, fcuk=50, fsv=330, num_sv=1, p_theta=0, step=10, s_min=100, s_max=None):
+        """
+        按剪力设计值反算最大箍筋间距（vcs 与间距的平方根成反比），可沿梁长批量计算
+        :param vd: 剪力设计值数组（kN）
+        :param fcuk: 混凝土立方体抗压强度标准值（MPa）
+        :param fsv: 箍筋抗拉强度设计值（MPa）
+        :param num_sv: 箍筋肢数的一半（同 shear_capacity）
+        :param p_theta: 预应力弯起钢束角度（°），可为数组
+        :param step: 间距取整模数（mm），向下取整
+        :param s_min: 最小施工间距（mm）
+        :param s_max: 构造最大间距（mm），默认取 min(h / 2, 400)
+        :return: 箍筋间距数组（mm），所需间距小于 s_min 时为 nan
+        """
+        vd = np.asarray(vd, dtype=float)
+        s_max = min(self.h * 1e3 / 2, 400) if s_max is None else s_max
+        res = self.evaluate_shear(1, 1, fcuk, fsv, num_sv, np.asarray(p_theta, dtype=float))
+        vcs_req = vd - res.vs
+        with np.errstate(divide='ignore'):
+            space = np.where(vcs_req > 0, (res.vc / vcs_req) ** 2, np.inf)
+        return snap_spacing(space, step, s_min, s_max)
+
+
+def rectangle_bend_batch(b, h, fcd, ad1, anum1, fsd1, ad2, anum2, fsd2, md, vd=1, pd=15.4, pnum=0, fpd=1260, a=50,
+                         hoop=16, space_sv=100, fcuk=50, fsv=330, num_sv=1, p_theta=0):
+    """
+    沿梁长批量进行矩形截面受弯与抗剪验算，参数含义同 RectangleBend 及其 capacity、shear_capacity，
+    均可为可相互广播的数组（各截面参数表可用 rectangle_bend_batch(**table.to_dict('series')) 传入）
+    :return: DataFrame，列为 x, m_resistance, flexure_safety, over_reinforced（超筋破坏）,
+        compression_unyielded（受压钢筋未屈服）, vcs, vpd, vr, shear_safety
+    """
+    (b, h, fcd, ad1, anum1, fsd1, ad2, anum2, fsd2, md, vd, pd, pnum, fpd, a, hoop, space_sv, fcuk, fsv, num_sv,
+     p_theta) = np.broadcast_arrays(*[np.asarray(i, dtype=float) for i in (
+        b, h, fcd, ad1, anum1, fsd1, ad2, anum2, fsd2, md, vd, pd, pnum, fpd, a, hoop, space_sv, fcuk, fsv, num_sv,
+        p_theta)])
+    as1 = get_as(ad1, anum1)
+    as2 = get_as(ad2, anum2)
+    ap = get_as(pd, pnum)
+    xi_b = 0.49
+    aa = a + hoop + ad1 / 2        # 钢筋合力点到边缘
+    h0 = h - aa / 1e3
+
+    # 受弯
+    x = (fsd1 * as1 + fpd * ap - fsd2 * as2) / 1e6 / (fcd * b)
+    over_reinforced = x > xi_b * h0
+    x = np.where(over_reinforced, xi_b * h0, x)
+    compression_unyielded = x < 2 * aa / 1e3
+    m_unyielded = fpd * ap * (h0 - 0.25) / 1e3 + fsd1 * as1 * (h0 - aa / 1e3) / 1e3
+    m_yielded = fcd * b * x * (h0 - x) * 1e3 + fsd2 * as2 * (h0 - aa / 1e3) / 1e3
+    m_resistance = np.where(compression_unyielded, m_unyielded, m_yielded)
+
+    # 抗剪
+    psv = get_as(hoop, 2) * num_sv / (space_sv * b * 1e3)
+    a_2 = np.where(pnum != 0, 1.25, 1)
+    p = np.minimum((as1 + ap) / (b * h0) / 1e6 * 100, 2.5)
+    vcs = 0.45 * 1e-3 * a_2 * b * h0 * 1e6 * ((2 + 0.6 * p) * fcuk ** 0.5 * (psv * fsv)) ** 0.5
+    vpd = 0.75 * 1e-3 * fpd * ap * np.sin(p_theta * np.pi / 180)
+    vr = vcs + vpd
+
+    with np.errstate(divide='ignore'):
+        flexure_safety = m_resistance / md
+        shear_safety = vr / vd
+    # 参数 pd 与 pandas 同名，表格由 _frame 生成
+    return _frame(x=x, m_resistance=m_resistance, flexure_safety=flexure_safety, over_reinforced=over_reinforced,
+                  compression_unyielded=compression_unyielded, vcs=vcs, vpd=vpd, vr=vr, shear_safety=shear_safety)
+
+
+def _frame(**columns):
+    """由同形状数组生成 DataFrame，多维数组按行展开"""
+    return pd.DataFrame({k: np.ravel(v) for k, v in columns.items()})
+
+
+def crack_width_table(secs, table, sec_col='Section', n_col='Axial', m_col='Moment-y'):
+    """
+    对 midas 导出的频遇组合内力表逐截面批量计算裂缝宽度
+    :param secs: {截面名称: RectangleCompress 或 CircularCompress}
+    :param table: 内力表 DataFrame，每行为一个单元、施工阶段或组合
+    :param sec_col: 截面名称列名
+    :param n_col: 轴力列名（kN）
+    :param m_col: 弯矩列名（kN.m）
+    :return: 增加 wcr 列（mm）的内力表
+    """
+    wcr = np.full(len(table), np.nan)
+    ns = table[n_col].to_numpy(dtype=float)
+    ms = table[m_col].to_numpy(dtype=float)
+    for name, idx in table.groupby(sec_col, sort=False).indices.items():
+        wcr[idx] = secs[name].crack_width_batch(ns[idx], ms[idx])
+    return table.assign(wcr=wcr)
+
+
+def hull_filter(nd, md, symmetric=False):
+    """
+    筛选可能控制设计的内力组合：截面 N-M 相关曲线外凸且包含原点时，利用率为 (N, M) 的凸函数，
+    其最大值只可能出现在内力点集的凸包顶点上。仅适用于圆形截面，矩形截面应使用 pareto_filter
+    :param nd: 轴力数组（kN）
+    :param md: 弯矩数组（kN.m）
+    :param symmetric: 截面是否对称，对称时按弯矩绝对值筛选
+    :return: 保留的内力组合索引（升序，轴力不大于 0 的组合全部保留）
+    """
+    nd = np.asarray(nd, dtype=float)
+    md = np.asarray(md, dtype=float)
+    md = np.abs(md) if symmetric else md
+    keep = np.flatnonzero(nd <= 0)
+    idx = np.flatnonzero(nd > 0)
+    if len(idx) == 0:
+        return keep
+
+    from scipy import spatial
+
+    pts = np.column_stack([nd[idx], md[idx]])
+    try:
+        vertices = spatial.ConvexHull(pts).vertices
+    except spatial.QhullError:
+        # 点数不足或共线时取各坐标的极值点
+        vertices = np.r_[pts.argmin(axis=0), pts.argmax(axis=0)]
+    return np.union1d(keep, idx[vertices])
+
+
+def pareto_filter(nd, md, symmetric=False):
+    """
+    筛选可能控制设计的内力组合：轴向抗力 N_res(e) 随偏心距 e = M / N 增大而不增大，另一组合轴力与偏心距
+    均不小于本组合时，其利用率 N / N_res(e) 必不小于本组合，本组合予以剔除（Pareto 支配）。
+    不要求 N-M 相关曲线外凸，适用于矩形截面（受压钢筋屈服、界限破坏处相关曲线存在凹角）
+    :param nd: 轴力数组（kN）
+    :param md: 弯矩数组（kN.m）
+    :param symmetric: 截面是否对称，对称时按弯矩绝对值筛选
+    :return: 保留的内力组合索引（升序，轴力不大于 0 的组合全部保留）
+    """
+    nd = np.asarray(nd, dtype=float)
+    md = np.asarray(md, dtype=float)
+    md = np.abs(md) if symmetric else md
+    keep = np.flatnonzero(nd <= 0)
+    idx = np.flatnonzero(nd > 0)
+    if len(idx) == 0:
+        return keep
+
+    # 按偏心距降序（相同时轴力降序）排列，轴力大于此前所有组合最大轴力者未被支配
+    n = nd[idx]
+    order = np.lexsort((-n, -md[idx] / n))
+    n = n[order]
+    front = n > np.r_[-np.inf, np.maximum.accumulate(n)[:-1]]
+    return np.union1d(keep, idx[order[front]])
+
+
+def reduce_loads(table, n_col='N', m_col='M', by=None, symmetric=False, convex=False):
+    """
+    按截面分组对内力组合表进行筛选
+    :param table: 内力组合表 DataFrame
+    :param n_col: 轴力列名
+    :param m_col: 弯矩列名
+    :param by: 截面分组列名，默认整表视为一个截面
+    :param symmetric: 截面是否对称
+    :param convex: 截面 N-M 相关曲线是否外凸（圆形截面），外凸时按凸包筛选，否则按轴力、偏心距 Pareto 支配筛选
+    :return: 筛选后的内力组合表、被剔除的组合数量
+    """
+    select = hull_filter if convex else pareto_filter
+    nd = table[n_col].to_numpy(dtype=float)
+    md = table[m_col].to_numpy(dtype=float)
+    if by is None:
+        keep = select(nd, md, symmetric)
+    else:
+        groups = table.groupby(by, sort=False).indices.values()
+        keep = np.sort(np.concatenate([i[select(nd[i], md[i], symmetric)] for i in groups]))
+    return table.iloc[keep], len(table) - len(keep)
+
+
+def capacity_governing(sec, nd, md, r=1.1):
+    """
+    先筛选控制组合，再对保留的组合进行承载力计算。圆形截面相关曲线外凸，按凸包筛选；
+    矩形截面相关曲线非外凸，剔除轴力、偏心距均被其他组合超过的组合
+    :param sec: RectangleCompress 或 CircularCompress 截面
+    :param nd: 基本组合下轴力数组（kN）
+    :param md: 基本组合下弯矩数组（kN.m）
+    :param r: 结构重要性系数，默认 1.1
+    :return: 控制组合计算结果 DataFrame（索引为组合在输入中的位置）、被剔除的组合数量
+    """
+    nd = np.asarray(nd, dtype=float)
+    md = np.asarray(md, dtype=float)
+    if isinstance(sec, CircularCompress):
+        idx = hull_filter(nd, md, symmetric=True)
+        result = pd.DataFrame(circular_capacity_grid([sec], nd[idx], md[idx], r)[0], index=idx)
+    else:
+        idx = pareto_filter(nd, md)
+        result = sec.capacity_batch(pd.Series(nd[idx], index=idx), md[idx], r)
+    return result, len(nd) - len(idx)
+
+
+def _circular_layout(ad, d, fcd, fsd1, fsd2, covers, hoop, anum_min, anum_step, s_min, nd, md, ns, ms, vd, fc1, sk,
+                     r, wcr_max):
+    """单一钢筋直径下满足全部验算的最少根数，供 design_circular 在进程池中调用"""
+    for c in sorted(covers):
+        # 保护层增大时承载力、裂缝与抗剪均不利，首个满足抗剪的保护层即为该直径下的最优解
+        sec = CircularCompress(d, anum_min, ad, fcd, fsd1, fsd2, c, hoop)
+        if vd is not None and sec.shear_capacity(fc1, sk, np.abs(vd).max()) < 1:
+            continue
+        anum_max = int(2 * np.pi * sec.rs * 1e3 // (ad + s_min))
+
+        def utilization(trial):
+            # 超出相关曲线适用范围的组合（nan）按不通过计
+            u = trial.envelope().utilization(nd, md, r)
+            return np.where(np.isnan(u), np.inf, u).max(initial=0)
+
+        def passed(anum):
+            trial = CircularCompress(d, anum, ad, fcd, fsd1, fsd2, c, hoop)
+            if utilization(trial) > 1:
+                return False
+            return ns is None or trial.crack_width_batch(ns, ms).max(initial=0) <= wcr_max
+
+        # 承载力与裂缝宽度均随钢筋根数单调改善，二分查找最少根数
+        anums = np.arange(anum_min, anum_max + 1, anum_step)
+        if len(anums) == 0 or not passed(anums[-1]):
+            return None
+        lo, hi = 0, len(anums) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if passed(anums[mid]):
+                hi = mid
+            else:
+                lo = mid + 1
+
+        best = CircularCompress(d, anums[lo], ad, fcd, fsd1, fsd2, c, hoop)
+        return {
+            'anum': anums[lo],
+            'ad': ad,
+            'c': c,
+            'As': best.As,
+            'utilization': utilization(best),
+            'wcr': np.nan if ns is None else best.crack_width_batch(ns, ms).max(initial=0),
+            'shear': np.nan if vd is None else best.shear_capacity(fc1, sk, np.abs(vd).max()),
+        }
+    return None
+
+
+def design_circular(d, fcd, fsd1, fsd2, nd, md, ns=None, ms=None, vd=None, fc1=30, sk=150,
+                    ads=(20, 22, 25, 28, 32, 36), covers=(50, 60, 70), hoop=12, anum_min=8, anum_step=2, s_min=80,
+                    r=1.1, wcr_max=0.2, processes=None):
+    """
+    圆形截面纵筋配置优化：在钢筋根数、直径与保护层组合中寻找满足承载力、裂缝和抗剪验算且用钢量最少的布置
+    :param d: 截面直径（m）
+    :param fcd: 混凝土抗压强度设计值（MPa）
+    :param fsd1: 钢筋抗拉强度设计值（MPa）
+    :param fsd2: 钢筋抗压强度设计值（MPa）
+    :param nd: 基本组合轴力数组（kN），须全部为压力
+    :param md: 基本组合弯矩数组（kN.m）
+    :param ns: 频遇组合轴力数组（kN），默认不验算裂缝
+    :param ms: 频遇组合弯矩数组（kN.m）
+    :param vd: 剪力设计值数组（kN），默认不验算抗剪
+    :param fc1: 混凝土抗压强度标准值（MPa）
+    :param sk: 箍筋间距（mm）
+    :param ads: 备选纵筋直径（mm）
+    :param covers: 备选保护层厚度（mm）
+    :param hoop: 箍筋直径（mm）
+    :param anum_min: 最少钢筋根数
+    :param anum_step: 钢筋根数步长
+    :param s_min: 纵筋最小净距（mm），用于确定最多钢筋根数
+    :param r: 结构重要性系数，默认 1.1
+    :param wcr_max: 裂缝宽度限值（mm）
+    :param processes: 进程数，默认为 CPU 数，取 1 时不使用进程池
+    :return: 各直径下的最优布置 DataFrame，按钢筋面积升序排列，首行即为最优解；均不满足时为空表
+    """
+    nd = np.asarray(nd, dtype=float)
+    md = np.asarray(md, dtype=float)
+    if (nd <= 0).any():
+        # 相关曲线仅覆盖受压区，偏拉组合无法按利用率验算
+        raise ValueError(f'design_circular 仅适用于偏心受压组合，存在 {(nd <= 0).sum()} 组轴力不大于 0 的组合')
+    idx = hull_filter(nd, md, symmetric=True)
+    nd, md = nd[idx], md[idx]
+    ns = None if ns is None else np.asarray(ns, dtype=float)
+    ms = None if ms is None else np.asarray(ms, dtype=float)
+    vd = None if vd is None else np.asarray(vd, dtype=float)
+    args = (d, fcd, fsd1, fsd2, tuple(covers), hoop, anum_min, anum_step, s_min, nd, md, ns, ms, vd, fc1, sk,
+            r, wcr_max)
+
+    if processes == 1:
+        layouts = [_circular_layout(ad, *args) for ad in ads]
+    else:
+        with futures.ProcessPoolExecutor(processes) as pool:
+            layouts = list(pool.map(_circular_layout, ads, *[[i] * len(ads) for i in args]))
+
+    layouts = [i for i in layouts if i is not None]
+    columns = ['anum', 'ad', 'c', 'As', 'utilization', 'wcr', 'shear']
+    return pd.DataFrame(layouts, columns=columns).sort_values('As', ignore_index=True)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,321 @@
+"""
+纤维截面分析
+1. 任意多边形（含 cad.OneSec 网格）截面离散为纤维
+2. 按平截面假定求解 N-M-曲率关系及极限承载力（单位：m、kN、MPa，受压为正）
+"""
+
+import numpy as np
+
+from concrete import bracket_root
+
+
+def polygon_area(poly):
+    """多边形面积（顶点按任意方向排列）"""
+    poly = np.asarray(poly, dtype=float)
+    x, y = poly[:, 0], poly[:, 1]
+    return abs(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))) / 2
+
+
+def points_in_polygon(pts, poly):
+    """
+    射线法判断一组点是否位于多边形内
+    :param pts: 点坐标，(n, 2)
+    :param poly: 多边形顶点，(m, 2)
+    :return: 布尔数组，(n,)
+    """
+    pts = np.asarray(pts, dtype=float)
+    poly = np.asarray(poly, dtype=float)
+    x, y = pts[:, 0:1], pts[:, 1:2]
+    x1, y1 = poly[:, 0], poly[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    cross = (y1 > y) != (y2 > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        xc = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    return (cross & (x < xc)).sum(axis=1) % 2 == 1
+
+
+def ring_bars(num, ad, rs, center=(0, 0)):
+    """
+    圆周均布钢筋
+    :param num: 钢筋根数
+    :param ad: 钢筋直径（mm）
+    :param rs: 钢筋布置半径（m）
+    :param center: 圆心坐标 (z, y)
+    :return: 钢筋纤维 (z, y, 面积 m2)
+    """
+    t = np.arange(num) * 2 * np.pi / num
+    area = np.full(num, np.pi * (ad / 2000) ** 2)
+    return center[0] + rs * np.sin(t), center[1] + rs * np.cos(t), area
+
+
+def row_bars(num, ad, y, width, cover):
+    """
+    水平一排均布钢筋
+    :param num: 钢筋根数
+    :param ad: 钢筋直径（mm）
+    :param y: 钢筋中心 y 坐标（m）
+    :param width: 截面宽度（m），截面关于 z = 0 对称
+    :param cover: 边排钢筋中心到侧边距离（m）
+    :return: 钢筋纤维 (z, y, 面积 m2)
+    """
+    z = np.linspace(-width / 2 + cover, width / 2 - cover, num) if num > 1 else np.zeros(num)
+    return z, np.full(num, y, dtype=float), np.full(num, np.pi * (ad / 2000) ** 2)
+
+
+class FiberSection:
+    def __init__(self, z, y, area, fcd, bars=(), fsd1=330, fsd2=330, es=2e5, eps0=0.002, epscu=0.0033):
+        """
+        纤维截面，坐标在构造时平移至混凝土形心
+        :param z: 混凝土纤维水平坐标（m）
+        :param y: 混凝土纤维竖向坐标（m）
+        :param area: 混凝土纤维面积（m2）
+        :param fcd: 混凝土抗压强度设计值（MPa）
+        :param bars: 钢筋纤维 (z, y, 面积 m2)，可由 ring_bars、row_bars 生成，多组时按列拼接
+        :param fsd1: 钢筋抗拉强度设计值（MPa）
+        :param fsd2: 钢筋抗压强度设计值（MPa）
+        :param es: 钢筋弹性模量（MPa）
+        :param eps0: 混凝土峰值压应变
+        :param epscu: 混凝土极限压应变
+        """
+        area = np.asarray(area, dtype=float)
+        self.center = (np.dot(z, area) / area.sum(), np.dot(y, area) / area.sum())
+        self.z = np.asarray(z, dtype=float) - self.center[0]
+        self.y = np.asarray(y, dtype=float) - self.center[1]
+        self.area = area
+        bars = [np.asarray(i, dtype=float).ravel() for i in bars] if len(bars) else [np.zeros(0)] * 3
+        self.bar_z = bars[0] - self.center[0]
+        self.bar_y = bars[1] - self.center[1]
+        self.bar_area = bars[2]
+
+        self.fcd = fcd
+        self.fsd1 = fsd1
+        self.fsd2 = fsd2
+        self.es = es
+        self.eps0 = eps0
+        self.epscu = epscu
+
+        self._levers = {}
+
+    @classmethod
+    def from_polygon(cls, outer, holes=(), size=0.05, **kwargs):
+        """
+        由多边形按方格划分纤维
+        :param outer: 外轮廓顶点 [(z, y), ...]（m）
+        :param holes: 内轮廓顶点列表
+        :param size: 纤维尺寸（m）
+        :param kwargs: 其余参数同 FiberSection
+        """
+        outer = np.asarray(outer, dtype=float)
+        lo, hi = outer.min(axis=0), outer.max(axis=0)
+        nz, ny = np.ceil((hi - lo) / size).astype(int)
+        gz = lo[0] + (np.arange(nz) + 0.5) * (hi[0] - lo[0]) / nz
+        gy = lo[1] + (np.arange(ny) + 0.5) * (hi[1] - lo[1]) / ny
+        pts = np.column_stack([np.repeat(gz, ny), np.tile(gy, nz)])
+
+        inside = points_in_polygon(pts, outer)
+        for hole in holes:
+            inside &= ~points_in_polygon(pts, hole)
+        pts = pts[inside]
+        # 纤维面积按多边形精确面积修正
+        area = polygon_area(outer) - sum(polygon_area(i) for i in holes)
+        return cls(pts[:, 0], pts[:, 1], np.full(len(pts), area / len(pts)), **kwargs)
+
+    @classmethod
+    def from_onesec(cls, one_sec, **kwargs):
+        """
+        由 cad.OneSec 划分的三角形网格生成纤维（需先调用 sec_cal），每个单元取为一根纤维
+        :param one_sec: cad.OneSec
+        :param kwargs: 其余参数同 FiberSection
+        """
+        nodes = np.asarray(one_sec.sec.mesh_nodes)
+        tri = nodes[np.asarray(one_sec.sec.mesh_elements)[:, :3]]
+        area = np.abs(np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])) / 2
+        center = tri.mean(axis=1)
+        return cls(center[:, 0], center[:, 1], area, **kwargs)
+
+    def _lever(self, theta):
+        """纤维沿受压方向 theta（rad，0 为 +y 方向）的坐标，按角度缓存"""
+        theta = float(theta)
+        if theta not in self._levers:
+            c, s = np.cos(theta), np.sin(theta)
+            self._levers[theta] = (self.y * c + self.z * s, self.bar_y * c + self.bar_z * s)
+        return self._levers[theta]
+
+    def concrete_stress(self, eps):
+        """混凝土抛物线-矩形应力应变关系，不计受拉"""
+        eps = np.clip(eps, 0, None)
+        return np.where(eps < self.eps0, self.fcd * (1 - (1 - eps / self.eps0) ** 2), self.fcd)
+
+    def steel_stress(self, eps):
+        """钢筋理想弹塑性应力应变关系"""
+        return np.clip(self.es * eps, -self.fsd1, self.fsd2)
+
+    def forces(self, eps_a, phi, theta=0):
+        """
+        给定形心应变与曲率积分截面内力
+        :param eps_a: 形心处应变，数组
+        :param phi: 曲率（1/m），与 eps_a 同形状，受压方向 theta 一侧受压为正
+        :param theta: 受压方向角（rad）
+        :return: 轴力 N（kN），弯矩 m_y = Σσ·A·y、m_z = Σσ·A·z（kN.m）
+        """
+        eps_a, phi = np.broadcast_arrays(np.asarray(eps_a, dtype=float), np.asarray(phi, dtype=float))
+        d, bar_d = self._lever(theta)
+        eps_c = eps_a[..., None] + phi[..., None] * d
+        eps_s = eps_a[..., None] + phi[..., None] * bar_d
+        f_c = self.concrete_stress(eps_c) * self.area * 1e3
+        f_s = self.steel_stress(eps_s) * self.bar_area * 1e3
+        n = f_c.sum(axis=-1) + f_s.sum(axis=-1)
+        m_y = f_c @ self.y + f_s @ self.bar_y
+        m_z = f_c @ self.z + f_s @ self.bar_z
+        return n, m_y, m_z
+
+    def _eps_bounds(self, phi, theta):
+        """轴力随形心应变单调增加，返回包含全截面受拉屈服至全截面压碎的应变区间"""
+        d, bar_d = self._lever(theta)
+        d_max = np.abs(np.r_[d, bar_d]).max()
+        span = np.abs(phi) * d_max
+        return -self.fsd1 / self.es - span - 1e-3, self.epscu + span + 1e-3
+
+    def moment_curvature(self, n, phi, theta=0):
+        """
+        给定轴力求各曲率下的截面弯矩
+        :param n: 轴力（kN），标量或与 phi 同形状的数组
+        :param phi: 曲率数组（1/m）
+        :param theta: 受压方向角（rad）
+        :return: dict，键为 phi, eps_a, n, m（沿 theta 方向弯矩）, m_y, m_z, eps_max（最大压应变）,
+            ultimate（是否达到极限压应变）, converged
+        """
+        n, phi = np.broadcast_arrays(np.asarray(n, dtype=float), np.asarray(phi, dtype=float))
+        lo, hi = self._eps_bounds(phi, theta)
+        eps_a, converged, _ = bracket_root(lambda e: self.forces(e, phi, theta)[0] - n, lo, hi, xtol=1e-12)
+        n_r, m_y, m_z = self.forces(eps_a, phi, theta)
+        d, _ = self._lever(theta)
+        eps_max = eps_a + np.abs(phi) * np.where(phi >= 0, d.max(), -d.min())
+        return {
+            'phi': phi,
+            'eps_a': eps_a,
+            'n': n_r,
+            'm': m_y * np.cos(theta) + m_z * np.sin(theta),
+            'm_y': m_y,
+            'm_z': m_z,
+            'eps_max': eps_max,
+            'ultimate': eps_max >= self.epscu,
+            'converged': converged,
+        }
+
+    def ultimate_forces(self, c, theta=0):
+        """
+        受压边缘达到极限压应变时的截面内力
+        :param c: 受压区高度（m），数组
+        :param theta: 受压方向角（rad），可与 c 广播
+        :return: 轴力 N（kN）、弯矩 m_y、m_z（kN.m）
+        """
+        c, theta = np.broadcast_arrays(np.asarray(c, dtype=float), np.asarray(theta, dtype=float))
+        n, m_y, m_z = np.zeros(c.shape), np.zeros(c.shape), np.zeros(c.shape)
+        for t in np.unique(theta):
+            sel = theta == t
+            d_top = self._lever(t)[0].max()
+            phi = self.epscu / c[sel]
+            n[sel], m_y[sel], m_z[sel] = self.forces(self.epscu - phi * d_top, phi, t)
+        return n, m_y, m_z
+
+    def capacity(self, n, theta=0, c_max=None):
+        """
+        给定轴力求极限弯矩（受压边缘达到极限压应变）
+        :param n: 轴力数组（kN）
+        :param theta: 受压方向角（rad）
+        :param c_max: 受压区高度搜索上限（m），默认取截面沿 theta 方向高度的 10 倍
+        :return: 受压区高度 c、沿 theta 方向弯矩 m、m_y、m_z；轴力超出截面能力时为 nan
+        """
+        n = np.asarray(n, dtype=float)
+        d = self._lever(theta)[0]
+        c_max = 10 * (d.max() - d.min()) if c_max is None else c_max
+        c, _, _ = bracket_root(lambda t: self.ultimate_forces(t, theta)[0] - n,
+                               np.full(n.shape, 1e-6), np.full(n.shape, c_max), xtol=1e-9)
+        _, m_y, m_z = self.ultimate_forces(np.where(np.isnan(c), c_max, c), theta)
+        m = np.where(np.isnan(c), np.nan, m_y * np.cos(theta) + m_z * np.sin(theta))
+        return c, m, m_y, m_z
+
+
+class BiaxialSurface:
+    def __init__(self, n, mr):
+        """
+        N-My-Mz 破坏面，以轴力分层、弯矩矢量方向均分的抗弯承载力表格存储
+        :param n: 轴力分层（kN），升序
+        :param mr: 各轴力层、各弯矩方向的抗弯承载力（kN.m），(len(n), 方向数)，方向角 atan2(m_z, m_y) 自 -π 起均分
+        """
+        self.n = np.asarray(n, dtype=float)
+        self.mr = np.asarray(mr, dtype=float)
+
+    @classmethod
+    def from_fiber(cls, sec, n_theta=72, n_c=200, n_n=100):
+        """
+        按中性轴方向网格计算纤维截面的破坏面
+        :param sec: FiberSection
+        :param n_theta: 受压方向角采样数
+        :param n_c: 每个方向的受压区高度采样数
+        :param n_n: 轴力分层数
+        """
+        thetas = np.linspace(-np.pi, np.pi, n_theta, endpoint=False)
+        c, theta = np.meshgrid(np.geomspace(1e-3, 20, n_c), thetas)
+        scale = np.array([np.ptp(sec._lever(t)[0]) for t in thetas])[:, None]
+        n, m_y, m_z = sec.ultimate_forces(c * scale, theta)
+
+        # 轴力随受压区高度单调增加，各方向插值至共同的轴力分层
+        n_grid = np.linspace(n[:, 0].max(), n[:, -1].min(), n_n)
+        m_y = np.array([np.interp(n_grid, n[i], m_y[i]) for i in range(n_theta)])
+        m_z = np.array([np.interp(n_grid, n[i], m_z[i]) for i in range(n_theta)])
+
+        # 各轴力层按弯矩矢量方向重新插值至均分网格
+        beta = np.arctan2(m_z, m_y)
+        m = np.hypot(m_y, m_z)
+        beta_grid = np.linspace(-np.pi, np.pi, n_theta, endpoint=False)
+        mr = np.empty((n_n, n_theta))
+        for i in range(n_n):
+            order = np.argsort(beta[:, i])
+            mr[i] = np.interp(beta_grid, beta[order, i], m[order, i], period=2 * np.pi)
+        return cls(n_grid, mr)
+
+    def m_resistance(self, nd, beta):
+        """
+        双线性插值得到指定轴力与弯矩方向下的抗弯承载力（kN.m），轴力超出范围时为 nan
+        :param nd: 轴力数组（kN）
+        :param beta: 弯矩矢量方向角 atan2(m_z, m_y)（rad）
+        """
+        nd = np.asarray(nd, dtype=float)
+        n_beta = self.mr.shape[1]
+        u = np.interp(nd, self.n, np.arange(len(self.n)))
+        i = np.clip(np.floor(u).astype(int), 0, len(self.n) - 2)
+        fu = u - i
+        v = (np.asarray(beta, dtype=float) + np.pi) / (2 * np.pi) * n_beta
+        j = np.floor(v).astype(int) % n_beta
+        fv = v - np.floor(v)
+        j1 = (j + 1) % n_beta
+        mr = (self.mr[i, j] * (1 - fu) * (1 - fv) + self.mr[i + 1, j] * fu * (1 - fv)
+              + self.mr[i, j1] * (1 - fu) * fv + self.mr[i + 1, j1] * fu * fv)
+        return np.where((nd >= self.n[0]) & (nd <= self.n[-1]), mr, np.nan)
+
+    def utilization(self, nd, my, mz, r=1.1):
+        """
+        批量计算双向偏压利用率（同一轴力下弯矩与抗弯承载力之比），轴力超出截面能力时为 inf
+        :param nd: 轴力数组（kN）
+        :param my: 弯矩数组（kN.m），与 m_y 同向
+        :param mz: 弯矩数组（kN.m），与 m_z 同向
+        :param r: 结构重要性系数，默认 1.1
+        """
+        nd = r * np.asarray(nd, dtype=float)
+        my = r * np.asarray(my, dtype=float)
+        mz = r * np.asarray(mz, dtype=float)
+        mr = self.m_resistance(nd, np.arctan2(mz, my))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(np.isnan(mr), np.inf, np.hypot(my, mz) / mr)
+
+    def save(self, path):
+        """保存为 .npz 文件"""
+        np.savez(path, n=self.n, mr=self.mr)
+
+    @classmethod
+    def load(cls, path):
+        """读取 save 保存的 .npz 文件"""
+        with np.load(path) as data:
+            return cls(data['n'], data['mr'])
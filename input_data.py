@@ -1,16 +1,30 @@
-import clr
+import functools
+import os
+import queue
+from collections import abc
+from contextlib import contextmanager
 import numpy as np
 import pandas as pd
-import pymysql
 
-clr.FindAssembly("SmartRoadBridge.Alignment")
-clr.AddReference('SmartRoadBridge.Alignment')
-clr.AddReference('System.Collections')
 
-from SmartRoadBridge.Alignment import Align
-from System import Array, String, Double
-from System.Collections.Generic import List
+@functools.lru_cache(maxsize=None)
+def dotnet():
+    """
+    首次使用时加载 .NET 线路程序集（pythonnet），之后直接返回缓存
+    :return: Align, Array, String
+    """
+    import clr
+
+    clr.FindAssembly("SmartRoadBridge.Alignment")
+    clr.AddReference('SmartRoadBridge.Alignment')
+    clr.AddReference('System.Collections')
+
+    from SmartRoadBridge.Alignment import Align
+    from System import Array, String
+    return Align, Array, String
 
+
+# import pymysql
 # conn=pymysql.connect(host='cdb-2ashfo5g.bj.tencentcdb.com',
 #     user = 'liu' ,passwd='liuning1234' ,port= 10033 ,db='testdb' ,charset='utf8')
 # cur = conn.cursor()
@@ -32,8 +46,27 @@ from System.Collections.Generic import List
 #     AlignList[name]=Align(name,icd,sqx,dmx,cg)
 
 
-def get_ei(ei_row, AlignList):
+def get_ei(ei_row, AlignList, native=False, cache_dir=None):
+    """
+    由 ei_tbl 数据行生成路线并加入 AlignList
+    :param ei_row: 数据行，含 Name, ICD, SQX, DMX, CG
+    :param AlignList: ei 数据字典
+    :param native: 是否使用 alignment.Alignment（不依赖 .NET，计算结果与 SmartRoadBridge.Alignment 一致，
+        见 check_alignment.py），默认使用 SmartRoadBridge.Alignment
+    :param cache_dir: native 时的缓存目录，按 EI 数据内容哈希缓存解析结果，默认不缓存
+    """
     name = ei_row.Name
+    if native:
+        import alignment
+
+        texts = (ei_row.ICD.strip(), ei_row.SQX.strip(), ei_row.DMX.strip(), ei_row.CG.strip())
+        if cache_dir is None:
+            AlignList[name] = alignment.Alignment(name, *texts)
+        else:
+            AlignList[name] = alignment.cached_alignment(name, *texts, cache_dir=cache_dir)
+        return
+
+    Align, Array, String = dotnet()
     icd = Array[String](ei_row.ICD.strip().split('\r\n'))
     sqx = Array[String](ei_row.SQX.strip().split('\r\n'))
     dmx = Array[String](ei_row.DMX.strip().split('\r\n'))
@@ -68,6 +101,31 @@ def get_distance(rmp, sta, AlignList, ml='M1k'):
     return sta1, dis1
 
 
+def get_distance_batch(rmp, stations, AlignList, ml='M1k'):
+    """
+    通过一组主线桩号，批量获取主线到匝道距离
+    路线为 alignment.Alignment 时各桩号法线一次向量化求交；为 .NET Align 时逐个调用 get_distance，并无加速，
+    批量计算时应以 native=True 生成路线
+    :param rmp: 匝道名称
+    :param stations: 主线桩号数组
+    :param ml: 主线名称，默认为 M1K
+    :return: 匝道里程数组, 距离数组（alignment.Alignment 法线与匝道无交点时为 nan）
+    """
+    main = AlignList[ml.upper()]
+    ramp = AlignList[rmp.upper()]
+    stations = np.asarray(stations, dtype=float)
+    if not (hasattr(main, 'coord') and hasattr(ramp, 'intersect')):
+        result = np.array([get_distance(rmp, sta, AlignList, ml) for sta in stations.ravel()]).reshape(-1, 2)
+        return result[:, 0].reshape(stations.shape), result[:, 1].reshape(stations.shape)
+
+    cord1 = main.coord(stations)  # 主线坐标
+    cord2 = main.direction(stations)  # 主线切线
+    sta1 = ramp.intersect(cord1[..., 0], cord1[..., 1], cord1[..., 0] - cord2[..., 1], cord1[..., 1] + cord2[..., 0])
+    cord3 = ramp.coord(np.nan_to_num(sta1, nan=ramp.start))  # 匝道切点
+    dis1 = np.where(np.isnan(sta1), np.nan, np.hypot(*np.moveaxis(cord3 - cord1, -1, 0)))
+    return sta1, dis1
+
+
 def get_cut_line(AlignList, line: str, sta: float, length: 'float > 0' = 100.0):
     """
     获取指定路线指定桩号切线（长度默认为 100m）
@@ -88,5 +146,206 @@ def get_cut_line(AlignList, line: str, sta: float, length: 'float > 0' = 100.0):
     return [start, end]
 
 
+
+EI_COLUMNS = ('Name', 'ICD', 'SQX', 'DMX', 'CG')
+
+
+class EIRepository:
+    def __init__(self, connect, placeholder='%s', size=4, table='ei_tbl'):
+        """
+        ei 数据库，连接复用，按名称批量读取
+        :param connect: 新建数据库连接的函数
+        :param placeholder: SQL 参数占位符，pymysql 为 %s，sqlite3 为 ?
+        :param size: 连接池大小
+        :param table: 表名，列为 Name, ICD, SQX, DMX, CG
+        """
+        self._connect = connect
+        self.placeholder = placeholder
+        self.table = table
+        self._pool = queue.LifoQueue(size)
+
+    @classmethod
+    def mysql(cls, size=4, table='ei_tbl', **kwargs):
+        """
+        MySQL 数据库
+        :param kwargs: pymysql.connect 参数，如 host, user, passwd, port, db, charset
+        """
+        import pymysql
+
+        return cls(lambda: pymysql.connect(**kwargs), '%s', size, table)
+
+    @classmethod
+    def sqlite(cls, path, size=4, table='ei_tbl'):
+        """
+        SQLite 数据库，可作为 MySQL 的本地离线替代（见 export_ei）
+        :param path: 数据库文件路径
+        """
+        import sqlite3
+
+        return cls(lambda: sqlite3.connect(path, check_same_thread=False), '?', size, table)
+
+    @contextmanager
+    def connection(self):
+        """从连接池取出连接，用完放回（池满时关闭）"""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            yield conn
+        except Exception:
+            conn.close()
+            raise
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close(self):
+        """关闭连接池中的全部连接"""
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _query(self, sql, params=()):
+        with self.connection() as conn:
+            cur = conn.cursor()
+            try:
+                cur.execute(sql, params)
+                return cur.fetchall()
+            finally:
+                cur.close()
+
+    def names(self):
+        """全部路线名称"""
+        return [i[0] for i in self._query(f'select Name from {self.table}')]
+
+    def fetch(self, names=None, batch=500):
+        """
+        按名称批量读取 ei 数据
+        :param names: 路线名称列表，默认读取全部
+        :param batch: 每条 SQL 的最多名称数
+        :return: DataFrame，列为 Name, ICD, SQX, DMX, CG
+        """
+        sql = f'select {", ".join(EI_COLUMNS)} from {self.table}'
+        if names is None:
+            rows = self._query(sql)
+        else:
+            names = list(dict.fromkeys(names))
+            rows = []
+            for i in range(0, len(names), batch):
+                part = names[i:i + batch]
+                rows += self._query(f'{sql} where Name in ({", ".join([self.placeholder] * len(part))})', part)
+        return pd.DataFrame([tuple(i) for i in rows], columns=EI_COLUMNS)
+
+
+class FlatFileRepository:
+    def __init__(self, path):
+        """
+        以文件夹保存的 ei 数据，每条路线为 <名称>.ICD, .SQX, .DMX, .CG 四个文本文件（缺少时为空）
+        :param path: 文件夹路径
+        """
+        self.path = path
+
+    def _files(self):
+        # (名称, 扩展名) 大写 -> 实际文件路径，文件名大小写不敏感（同 Windows）
+        files = {}
+        for i in os.listdir(self.path):
+            name, ext = os.path.splitext(i)
+            files[name.upper(), ext[1:].upper()] = os.path.join(self.path, i)
+        return files
+
+    def names(self):
+        return sorted(os.path.splitext(os.path.basename(v))[0] for k, v in self._files().items() if k[1] == 'ICD')
+
+    def _read(self, name, ext, files=None):
+        path = (self._files() if files is None else files).get((name.upper(), ext.upper()))
+        if path is None:
+            return ''
+        # 保留原换行符，.NET Align 按 \r\n 拆分
+        with open(path, encoding='utf-8', newline='') as f:
+            return f.read()
+
+    def fetch(self, names=None):
+        """
+        按名称读取 ei 数据，名称及扩展名不区分大小写
+        :param names: 路线名称列表，默认读取全部
+        :return: DataFrame，列为 Name, ICD, SQX, DMX, CG
+        """
+        files = self._files()
+        names = self.names() if names is None else [i for i in dict.fromkeys(names) if (i.upper(), 'ICD') in files]
+        return pd.DataFrame([[i] + [self._read(i, ext, files) for ext in EI_COLUMNS[1:]] for i in names],
+                            columns=EI_COLUMNS)
+
+
+def export_ei(repo, path, names=None, table='ei_tbl'):
+    """
+    将 ei 数据导出为 SQLite 数据库，作为离线数据源
+    :param repo: EIRepository 或 FlatFileRepository
+    :param path: SQLite 文件路径
+    :param names: 路线名称列表，默认导出全部
+    :param table: 表名
+    :return: 导出的路线数
+    """
+    import sqlite3
+
+    data = repo.fetch(names)
+    with sqlite3.connect(path) as conn:
+        conn.execute(f'create table if not exists {table} (Name text primary key, ICD text, SQX text, DMX text, '
+                     f'CG text)')
+        conn.executemany(f'insert or replace into {table} values (?, ?, ?, ?, ?)',
+                         data.itertuples(index=False, name=None))
+    conn.close()
+    return len(data)
+
+
+class AlignMap(abc.Mapping):
+    def __init__(self, repo, native=False, cache_dir=None):
+        """
+        与 AlignList 字典用法相同，首次访问某条路线时才读取数据并生成路线
+        :param repo: EIRepository 或 FlatFileRepository
+        :param native: 是否使用 alignment.Alignment，默认使用 SmartRoadBridge.Alignment
+        :param cache_dir: native 时的缓存目录，默认不缓存
+        """
+        self.repo = repo
+        self.native = native
+        self.cache_dir = cache_dir
+        self._aligns = {}
+        self._rows = {}
+        self._names = None
+
+    def preload(self, names):
+        """
+        一次读取多条路线数据（仍在首次访问时生成路线）
+        :param names: 路线名称列表
+        """
+        missing = [i for i in names if i not in self._rows and i not in self._aligns]
+        if missing:
+            for row in self.repo.fetch(missing).itertuples(index=False):
+                self._rows[row.Name] = row
+
+    def __getitem__(self, name):
+        if name not in self._aligns:
+            self.preload([name])
+            if name not in self._rows:
+                raise KeyError(name)
+            get_ei(self._rows.pop(name), self._aligns, self.native, self.cache_dir)
+        return self._aligns[name]
+
+    def __iter__(self):
+        if self._names is None:
+            self._names = self.repo.names()
+        return iter(self._names)
+
+    def __len__(self):
+        if self._names is None:
+            self._names = self.repo.names()
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._aligns or name in self._rows or name in iter(self)
+
 # print(get_distance('cca', 16430))
 
@@ -5,9 +5,6 @@
 import pandas as pd
 import numpy as np
 
-import matplotlib
-import matplotlib.pyplot as plt
-
 import os
 
 current_path = os.path.dirname(__file__)
@@ -273,6 +270,9 @@ def pile_l(llist, soil, d, F, h1=0, rho=26, t=0, k2=1.5, type=1, com=1):
     F：桩顶力
     """
 
+    import matplotlib
+    import matplotlib.pyplot as plt
+
     matplotlib.use('Agg')
     plt.rcParams['font.sans-serif'] = ['SimHei']    # 绘图支持中文
 
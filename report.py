@@ -3,8 +3,6 @@
 包含：风荷载计算
 """
 
-from pylatex import Document, Section, Subsection, Math, Command, Package, Enumerate, Tabular, LongTabu, Figure, LongTable
-from pylatex.utils import NoEscape, bold
 import pandas as pd
 import pile as pl
 import numpy as np
@@ -22,6 +20,8 @@ class Report():
     """
 
     def __init__(self, name, geo=geometry_options, doo=document_options):
+        from pylatex import Document, Package
+
         self.document_options = doo
         self.geometry_options = geo
         self.doc = Document(name, documentclass='ctexart',document_options=self.document_options, geometry_options=self.geometry_options)
@@ -32,12 +32,18 @@ class Report():
     def set_format1(self):
         """设置为常用格式，英文字体 Times，章节标题左对齐，大标题"""
 
+        from pylatex import Command
+        from pylatex.utils import NoEscape
+
         self.doc.preamble.append(Command('setmainfont', 'Times New Roman'))
         self.doc.preamble.append(Command('CTEXsetup', 'section', NoEscape(r'format={\raggedright\bfseries\Large}')))
 
     def set_format2(self):
         """设置为常用格式，英文字体 Times，章节标题左对齐，小标题"""
 
+        from pylatex import Command, Package
+        from pylatex.utils import NoEscape
+
         # self.doc.preamble.append(Command('setmainfont', 'Times New Roman'))
         self.doc.preamble.append(Command('CTEXsetup', 'section', NoEscape(r'format={\raggedright\bfseries\large}')))
         self.doc.preamble.append(Command('pagestyle', 'plain'))
@@ -55,6 +61,9 @@ class ReportWind(Report):
     """
 
     def __init__(self, name, geo=geometry_options, doo=document_options):
+        from pylatex import Command
+        from pylatex.utils import NoEscape
+
         super().__init__(name, geo, doo)
         self.doc.preamble.append(Command('title', NoEscape(r'\heiti 桥梁风荷载计算')))
         self.doc.preamble.append(Command('author', 'WYZ'))
@@ -64,6 +73,9 @@ class ReportWind(Report):
     def wind_report(self, wind_beam, wind_pier):
         """添加风荷载计算内容"""
 
+        from pylatex import Section, Math
+        from pylatex.utils import NoEscape
+
         self.wind = wind_beam.wind
 
         t1 = f'''桥梁抗风风险区域：R{self.wind.R}\n
@@ -134,6 +146,9 @@ class ReportPile(Report):
     """
 
     def __init__(self, name, geo=geometry_options, doo=document_options):
+        from pylatex import Command
+        from pylatex.utils import NoEscape
+
         super().__init__(name, geo, doo)
         self.doc.preamble.append(Command('title', NoEscape(r'\heiti 桥梁桩长计算')))
         self.doc.preamble.append(Command('author', ''))
@@ -143,6 +158,9 @@ class ReportPile(Report):
     def pile_report(self, pile, pile2, F, factor=1.25):
         """添加桩基长度计算内容"""
 
+        from pylatex import Section, Math, LongTabu, Figure, LongTable
+        from pylatex.utils import NoEscape, bold
+
         self.soil = pile.soil
         llist = pl.get_l(self.soil, pile.d, F, factor, pile.h1, pile.rho, pile.t, pile.k2, pile2.type, pile2.completion)
         ra_1, ra_2 = pl.pile_l(llist, self.soil, pile.d, F, pile.h1, pile.rho, pile.t, pile.k2, pile2.type, pile2.completion)
@@ -1,6 +1,11 @@
+import functools
+import os
+from concurrent import futures
 import numpy as np
 import pandas as pd
 
+current_path = os.path.dirname(__file__)
+
 E = 2.06 *10 ** 5
 type_1 = [
     [1, 1],
@@ -28,6 +33,298 @@ alpha = [
     [[1.35, 0.868, 0.915], [1.35, 1.375, 0.432]]
 ]
 
+# 截面分类查找表（1-4 对应 a-d 类，负值为按屈服强度调整的类别）
+# CLASS_1[形状, b/h > 0.8, 轴]：板厚 < 40 mm；CLASS_2[形状, 小行, 轴]：板厚 >= 40 mm
+CLASS_1 = np.array([i if np.ndim(i) == 2 else [i, i] for i in type_1])
+CLASS_2 = np.array(type_2)
+# ALPHA[类别, lam_b > 1.05] = (alpha1, alpha2, alpha3)
+ALPHA = np.array([[i, i] if np.ndim(i) == 1 else i for i in alpha])
+
+
+def get_class(t, shape, b=1, h=1, fy=345, n=0):
+    """
+    批量查表得到截面分类
+    :param t: 板厚数组（单位：mm）
+    :param shape: 杆件截面形状数组，取 P85 页表格列数
+    :param b: 工字型截面宽度（单位：mm）
+    :param h: 工字型截面高度（单位：mm）
+    :param fy: 屈服强度（单位：MPa）
+    :param n: 如果为第二个表格，取第几小行
+    :return: (m, 2) 整型数组，1-4 对应 a-d 类
+    """
+    t, shape, b, h, fy, n = np.broadcast_arrays(*[np.asarray(i) for i in (t, shape, b, h, fy, n)])
+    shape = shape.astype(int) - 1
+    if np.any((t >= 40) & (shape >= len(CLASS_2))):
+        raise ValueError(f'板厚不小于 40 mm 时截面形状只能取 1-{len(CLASS_2)}')
+    thin = CLASS_1[shape, (b / h > 0.8).astype(int)]
+    thick = CLASS_2[np.minimum(shape, len(CLASS_2) - 1), n.astype(int)]
+    cls = np.where((t < 40)[..., None], thin, thick)
+    # 负值类别：屈服强度大于 235 MPa 时取反，否则降低一类
+    neg = (cls[..., :1] < 0)
+    return np.where(neg, np.where((fy > 235)[..., None], -cls, -cls + 1), cls)
+
+
+def get_alpha(cls, lam_b):
+    """
+    按截面分类与相对长细比查表得到系数 alpha1-alpha3
+    :param cls: 截面分类数组，1-4 对应 a-d 类
+    :param lam_b: 相对长细比数组，与 cls 同形状
+    :return: 形状为 cls.shape + (3,) 的数组
+    """
+    cls = np.asarray(cls, dtype=int)
+    return ALPHA[cls - 1, (np.asarray(lam_b) > 1.05).astype(int)]
+
+
+def phi_cal(alpha, lam_b):
+    """
+    轴心压杆稳定系数
+    :param alpha: 系数 alpha1-alpha3，最后一维长度为 3
+    :param lam_b: 相对长细比
+    """
+    lam_b = np.asarray(lam_b, dtype=float)
+    a1, a2, a3 = np.moveaxis(np.asarray(alpha), -1, 0)
+    k = a2 + a3 * lam_b + lam_b ** 2
+    with np.errstate(divide='ignore', invalid='ignore'):
+        phi_2 = 1 / (2 * lam_b ** 2) * (k - (k ** 2 - 4 * lam_b ** 2) ** 0.5)
+    return np.where(lam_b > 0.215, phi_2, 1 - a1 * lam_b ** 2)
+
+
+# 稳定系数表：相对长细比步长与上限（查表时读取，修改后按新网格建表），超出上限时按公式计算
+PHI_STEP = 5e-4
+PHI_MAX = 4.0
+# 为 True 时 get_phi、get_phi_batch 默认按公式计算，用于校核查表结果
+EXACT_PHI = False
+
+
+@functools.lru_cache(maxsize=None)
+def phi_table(step=PHI_STEP, lam_max=PHI_MAX):
+    """
+    各类截面稳定系数曲线表（首次使用时计算）
+    :param step: 相对长细比步长
+    :param lam_max: 相对长细比上限
+    :return: lam_b 网格 (k,), phi 表 (4, 2, k)，前两维同 ALPHA
+    """
+    lam = np.arange(0, lam_max + step / 2, step)
+    return lam, phi_cal(ALPHA[:, :, None, :], lam)
+
+
+def phi_lookup(cls, lam_b, exact=None, step=None, lam_max=None):
+    """
+    按截面分类与相对长细比查表线性插值得到稳定系数
+    :param cls: 截面分类数组，1-4 对应 a-d 类
+    :param lam_b: 相对长细比数组，与 cls 同形状
+    :param exact: 是否按公式计算，默认取 EXACT_PHI
+    :param step: 稳定系数表相对长细比步长，默认取 PHI_STEP
+    :param lam_max: 稳定系数表相对长细比上限，默认取 PHI_MAX
+    """
+    cls = np.asarray(cls, dtype=int)
+    lam_b = np.asarray(lam_b, dtype=float)
+    if EXACT_PHI if exact is None else exact:
+        return phi_cal(get_alpha(cls, lam_b), lam_b)
+
+    lam, table = phi_table(PHI_STEP if step is None else step, PHI_MAX if lam_max is None else lam_max)
+    k = len(lam)
+    step = lam[1] - lam[0]
+    # 等步长网格直接定位区间，按曲线在展平表中的偏移取值
+    pos = lam_b / step
+    j = np.clip(np.floor(pos), 0, k - 2).astype(int)
+    w = pos - j
+    base = ((cls - 1) * 2 + (lam_b > 1.05)) * k + j
+    flat = table.reshape(-1)
+    phi = np.asarray(flat[base] * (1 - w) + flat[base + 1] * w)
+
+    # 超出表格范围及跨越 phi_1 / phi_2 分界点（0.215，两式在该点不连续）的区间按公式计算
+    out = ~(lam_b <= lam[-1]) | (np.abs(lam_b - 0.215) < step)
+    if np.any(out):
+        phi[out] = phi_cal(get_alpha(cls[out], lam_b[out]), lam_b[out])
+    return phi
+
+
+def get_phi_batch(l, i, u, t, shape, b=1, h=1, fy=345, n=0, exact=None):
+    """
+    批量计算多根杆件的轴心压杆稳定系数
+    :param l: 杆件长度数组（单位：m），长度 m
+    :param i: 回转半径（单位：cm），形状 (m, 2)，对应截面分类两列
+    :param u: 计算长度系数，可广播至 (m, 2)
+    :param t: 板厚数组（单位：mm）
+    :param shape: 杆件截面形状数组，取 P85 页表格列数
+    :param b: 工字型截面宽度（单位：mm）
+    :param h: 工字型截面高度（单位：mm）
+    :param fy: 屈服强度（单位：MPa）
+    :param n: 如果为第二个表格，取第几小行
+    :param exact: 是否按公式计算稳定系数，默认取 EXACT_PHI（查表插值）
+    :return: phi, lam_b，形状均为 (m, 2)
+    """
+    fy = np.asarray(fy, dtype=float)
+    l0 = np.asarray(l, dtype=float)[..., None] * np.asarray(u, dtype=float) * 100
+    lam_b = l0 / np.asarray(i, dtype=float) / np.pi * np.sqrt(fy[..., None] / E)
+    cls = get_class(t, shape, b, h, fy, n)
+    return phi_lookup(cls, lam_b, exact), lam_b
+
+
+def steel_c_batch(l, i, u, t, shape, A, b=1, h=1, fy=345, fd=305, n=0, exact=None):
+    """
+    批量进行受压构件稳定验算，参数同 get_phi_batch
+    :param A: 截面面积数组（单位：cm2）
+    :param fd: 强度设计值（单位：MPa）
+    :return: phi（(m, 2) 数组）, Ncrd（各杆件稳定承载力，单位：kN）
+    """
+    phi = get_phi_batch(l, i, u, t, shape, b, h, fy, n, exact)[0]
+    return phi, phi.min(axis=-1) * np.asarray(A) * np.asarray(fd) * 100 / 1000
+
+
+def beam_column_batch(nd, mx, phi, lam_b, A, Wx, my=0, Wy=np.inf, fy=345, fd=305, beta_mx=1.0, beta_my=1.0, r=1.0):
+    """
+    批量进行压弯（拉弯）构件强度与弯矩作用平面内稳定验算
+    强度：r * (|N| / (A * fd) + |Mx| / (Wx * fd) + |My| / (Wy * fd))
+    稳定：r * (N / (phi * A * fd) + beta_m * |M| / (W * fd * (1 - N / Ncr)))，Ncr 为各轴欧拉临界力，
+    轴力以受压为正，受拉时稳定项只计弯矩
+    :param nd: 轴力（单位：kN），杆件 x 组合表，形状 (m, c)，可为 DataFrame
+    :param mx: 绕 x 轴弯矩（单位：kN.m），形状同 nd
+    :param phi: 轴心压杆稳定系数，形状 (m, 2)，即 get_phi_batch 或 Steel_c.phi
+    :param lam_b: 相对长细比，形状 (m, 2)，与 phi 对应
+    :param A: 截面面积数组（单位：cm2），长度 m
+    :param Wx: 绕 x 轴截面模量数组（单位：cm3）
+    :param my: 绕 y 轴弯矩（单位：kN.m），默认不计
+    :param Wy: 绕 y 轴截面模量数组（单位：cm3）
+    :param fy: 屈服强度（单位：MPa）
+    :param fd: 强度设计值（单位：MPa）
+    :param beta_mx: x 轴等效弯矩系数，标量或长度 m 的数组
+    :param beta_my: y 轴等效弯矩系数，标量或长度 m 的数组
+    :param r: 结构重要性系数
+    :return: strength, stability 利用率矩阵 (m, c)，不大于 1 时满足要求，nd 为 DataFrame 时返回 DataFrame
+    """
+    frame = nd if isinstance(nd, pd.DataFrame) else None
+    nd, mx, my = [np.asarray(i, dtype=float) for i in (nd, mx, my)]
+
+    def col(x):
+        # 杆件参数转为列向量，与组合方向广播
+        return np.asarray(x, dtype=float).reshape(-1, 1)
+
+    phi, lam_b = np.asarray(phi, dtype=float), np.asarray(lam_b, dtype=float)
+    n_rd = col(A) * col(fd) / 10
+    mx_rd, my_rd = col(Wx) * col(fd) / 1000, col(Wy) * col(fd) / 1000
+    with np.errstate(divide='ignore'):
+        n_cr = col(A) * col(fy) / 10 / lam_b ** 2
+
+    nc = np.maximum(nd, 0)
+    strength = r * (np.abs(nd) / n_rd + np.abs(mx) / mx_rd + np.abs(my) / my_rd)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        amp_x = np.where(nc < n_cr[:, :1], 1 / (1 - nc / n_cr[:, :1]), np.inf)
+        amp_y = np.where(nc < n_cr[:, 1:], 1 / (1 - nc / n_cr[:, 1:]), np.inf)
+        # 无弯矩时不计放大系数（避免 0 * inf）
+        bend_x = np.where(mx == 0, 0, col(beta_mx) * np.abs(mx) / mx_rd * amp_x)
+        bend_y = np.where(my == 0, 0, col(beta_my) * np.abs(my) / my_rd * amp_y)
+        stability = r * (nc / (phi.min(axis=1, keepdims=True) * n_rd) + bend_x + bend_y)
+
+    if frame is not None:
+        strength = pd.DataFrame(strength, index=frame.index, columns=frame.columns)
+        stability = pd.DataFrame(stability, index=frame.index, columns=frame.columns)
+    return strength, stability
+
+
+def _truss_chunk(nd, mx, my, phi, lam_b, A, Wx, Wy, fy, fd, beta_mx, beta_my, r):
+    """逐行（杆件 x 组合）压弯验算，供 check_truss 在进程池中调用"""
+    strength, stability = beam_column_batch(nd[:, None], mx[:, None], phi, lam_b, A, Wx, my[:, None], Wy, fy, fd,
+                                            beta_mx, beta_my, r)
+    return strength[:, 0], stability[:, 0]
+
+
+def check_truss(forces, members, sections=None, elem_col='Elem', load_col='Load', sec_col='Section',
+                n_col='Axial', mx_col='Moment-y', my_col='Moment-z', fy=345, fd=305, beta_mx=1.0, beta_my=1.0,
+                r=1.0, exact=None, processes=None):
+    """
+    由 MIDAS 导出的杆件内力表批量进行钢桁架杆件强度与稳定验算
+    :param forces: 杆件内力表 DataFrame 或文件路径（csv 或 Excel），每行为一个单元的一个组合（及位置），
+        轴力以受拉为正，无弯矩列时按轴心受力计算
+    :param members: 杆件信息表，以单元号为索引或含 elem_col 列，列为 sec_col（截面库中的名称）, l（杆件长度，m）,
+        u_x, u_y（计算长度系数），可选 fy, fd, beta_mx, beta_my 列，缺省时取参数值
+    :param sections: 截面库，默认为 load_sections()
+    :param elem_col: 单元号列名
+    :param load_col: 荷载组合列名
+    :param sec_col: 截面名称列名
+    :param n_col: 轴力列名（kN）
+    :param mx_col: 绕截面强轴弯矩列名（kN.m）
+    :param my_col: 绕截面弱轴弯矩列名（kN.m）
+    :param fy: 屈服强度（单位：MPa）
+    :param fd: 强度设计值（单位：MPa）
+    :param beta_mx: x 轴等效弯矩系数
+    :param beta_my: y 轴等效弯矩系数
+    :param r: 结构重要性系数
+    :param exact: 是否按公式计算稳定系数，默认取 EXACT_PHI（查表插值）
+    :param processes: 进程数，默认为 CPU 数，取 1 时不使用进程池
+    :return: 各杆件验算结果 DataFrame，以单元号为索引，列为 Section, phi, Ncrd（kN）, strength, stability,
+        utilization, Load（控制组合）, passed
+    """
+    if not isinstance(forces, pd.DataFrame):
+        forces = pd.read_csv(forces) if str(forces).lower().endswith(('.csv', '.txt')) else pd.read_excel(forces)
+    sections = load_sections() if sections is None else sections
+    if elem_col in members.columns:
+        members = members.set_index(elem_col)
+
+    missing = set(members[sec_col]) - set(sections.index)
+    if missing:
+        raise KeyError(f'截面库中没有截面：{sorted(missing)}')
+    props = sections.loc[members[sec_col]].set_index(members.index)
+    member_fy = members['fy'].to_numpy(float) if 'fy' in members else np.full(len(members), float(fy))
+    member_fd = members['fd'].to_numpy(float) if 'fd' in members else np.full(len(members), float(fd))
+    l0 = members['l'].to_numpy(float)[:, None] * members[['u_x', 'u_y']].to_numpy(float)
+
+    # 按截面、计算长度与材料分组，每组只计算一次稳定系数
+    keys = pd.DataFrame({'section': members[sec_col].to_numpy(), 'l0x': l0[:, 0], 'l0y': l0[:, 1],
+                         'fy': member_fy})
+    group = keys.groupby(list(keys.columns), sort=False).ngroup().to_numpy()
+    first = np.unique(group, return_index=True)[1]
+    rep = props.iloc[first]
+    phi_g, lam_g = get_phi_batch(1, rep[['i_x', 'i_y']].to_numpy(), l0[first], rep['t'], rep['shape'], rep['b'],
+                                 rep['h'], member_fy[first], exact=exact)
+    phi, lam_b = phi_g[group], lam_g[group]
+
+    # 内力行对应的杆件
+    pos = members.index.get_indexer(forces[elem_col])
+    if np.any(pos < 0):
+        raise KeyError(f'杆件信息表中没有单元：{sorted(set(forces[elem_col][pos < 0]))[:10]}')
+
+    def column(name):
+        return -forces[name].to_numpy(float) if name == n_col else (
+            forces[name].to_numpy(float) if name in forces else np.zeros(len(forces)))
+
+    def member_value(name, default):
+        return members[name].to_numpy(float)[pos] if name in members else np.full(len(pos), float(default))
+
+    nd, mx, my = column(n_col), column(mx_col), column(my_col)
+    args = (nd, mx, my, phi[pos], lam_b[pos], props['A'].to_numpy()[pos], props['W_x'].to_numpy()[pos],
+            props['W_y'].to_numpy()[pos], member_fy[pos], member_fd[pos], member_value('beta_mx', beta_mx),
+            member_value('beta_my', beta_my))
+
+    if processes == 1:
+        strength, stability = _truss_chunk(*args, r)
+    else:
+        n_chunk = processes or os.cpu_count()
+        with futures.ProcessPoolExecutor(n_chunk) as pool:
+            chunks = [np.array_split(i, n_chunk) for i in args]
+            results = list(pool.map(_truss_chunk, *chunks, [r] * n_chunk))
+        strength = np.concatenate([i[0] for i in results])
+        stability = np.concatenate([i[1] for i in results])
+
+    # 各杆件取利用率最大的组合
+    rows = pd.DataFrame({'pos': pos, 'strength': strength, 'stability': stability,
+                         'utilization': np.fmax(strength, stability), 'Load': forces[load_col].to_numpy()})
+    grouped = rows.groupby('pos')
+    governing = rows.loc[grouped['utilization'].idxmax()].set_index('pos')
+    result = pd.DataFrame({
+        sec_col: members[sec_col],
+        'phi': phi.min(axis=1),
+        'Ncrd': phi.min(axis=1) * props['A'].to_numpy() * member_fd / 10,
+    }, index=members.index)
+    result['strength'] = grouped['strength'].max().reindex(range(len(members))).to_numpy()
+    result['stability'] = grouped['stability'].max().reindex(range(len(members))).to_numpy()
+    result['utilization'] = governing['utilization'].reindex(range(len(members))).to_numpy()
+    result['Load'] = governing['Load'].reindex(range(len(members))).to_numpy()
+    result['passed'] = result['utilization'] <= 1
+    return result
+
+
 class Steel_c():
     """受压构件验算
 
@@ -47,7 +344,7 @@ class Steel_c():
         self.lam = self.l / self.i
         self.lam_b = self.lam / np.pi * np.sqrt(self.fy / self.E)
     
-    def get_phi(self, t, shape, b=1, h=1, n=0):
+    def get_phi(self, t, shape, b=1, h=1, n=0, exact=None):
         """获取截面类型，得到相关系数
 
         参数：
@@ -56,43 +353,18 @@ class Steel_c():
         b：工字型截面宽度（单位：mm）
         h：工字型截面高度（单位：mm）
         n：如果为第二个表格，取第几小行
+        exact：是否按公式计算稳定系数，默认取 EXACT_PHI（查表插值）
         """
 
         # 获取截面类型
         self.t = t
-        if t < 40:
-            if shape == 2:
-                self.type = np.array(type_1[1][int(b / h > 0.8)])
-            else:
-                self.type = np.array(type_1[shape - 1])
-        else:
-            self.type = np.array(type_2[shape - 1][n])
-        
-        if self.type[0] < 0:
-            if self.fy > 235:
-                self.type = - self.type
-            else:
-                self.type = - self.type + 1
+        self.type = get_class(t, shape, b, h, self.fy, n)
 
         # 获取系数
-        self.alpha = []
-        for i, j in enumerate(self.type):
-            if j <= 2:
-                self.alpha.append(alpha[j - 1])
-            else:
-                m = int(self.lam_b[i] > 1.05)
-                self.alpha.append(alpha[j - 1][m])
-        
-        self.alpha = np.array(self.alpha)
-        
+        self.alpha = get_alpha(self.type, self.lam_b)
+
         # 计算轴心压杆稳定系数
-        phi_1 = 1 - self.alpha[:, 0] * self.lam_b ** 2
-        phi_2 = 1 / (2 * self.lam_b ** 2) * \
-            ((self.alpha[:, 1] + self.alpha[:, 2] * self.lam_b + self.lam_b ** 2)\
-             - ((self.alpha[:, 1] + self.alpha[:, 2] * self.lam_b + self.lam_b ** 2)\
-             ** 2 - 4 * self.lam_b ** 2) ** 0.5)
-        
-        self.phi = np.where(self.lam_b > 0.215, phi_2, phi_1)
+        self.phi = phi_lookup(self.type, self.lam_b, exact)
 
         return self.phi
 
@@ -109,3 +381,112 @@ class Steel_c():
 
         
 
+
+def section_props(kind, h, b, tw, tf):
+    """
+    由板件尺寸计算截面特性（不计圆角，单位：mm）
+    :param kind: 截面类别数组，I / H（双轴对称工字形）、tube（圆管，h 为外径、tw 为壁厚）、
+        angle（等边角钢，h 为肢宽、tw 为肢厚）
+    :param h: 截面高度
+    :param b: 截面宽度
+    :param tw: 腹板厚度
+    :param tf: 翼缘厚度
+    :return: A（cm2）, i_x, i_y（cm）, W_x, W_y（cm3，最外纤维弹性截面模量），角钢 y 轴取最小主轴
+    """
+    kind = np.asarray(kind)
+    h, b, tw, tf = [np.asarray(i, dtype=float) for i in (h, b, tw, tf)]
+
+    # 工字形
+    hw = h - 2 * tf
+    a_i = 2 * b * tf + hw * tw
+    ix_i = (b * h ** 3 - (b - tw) * hw ** 3) / 12
+    iy_i = (2 * tf * b ** 3 + hw * tw ** 3) / 12
+
+    # 圆管
+    d = h - 2 * tw
+    a_o = np.pi / 4 * (h ** 2 - d ** 2)
+    i_o = np.pi / 64 * (h ** 4 - d ** 4)
+
+    # 等边角钢，形心距肢背 c，主轴惯性矩 ix +- |ixy|
+    a_l = tw * (2 * h - tw)
+    c = (h ** 2 + h * tw - tw ** 2) / (2 * (2 * h - tw))
+    ix_l = (tw * (h - c) ** 3 + h * c ** 3 - (h - tw) * (c - tw) ** 3) / 3
+    ixy_l = h * tw * (h / 2 - c) * (tw / 2 - c) + tw * (h - tw) * (tw / 2 - c) * ((h + tw) / 2 - c)
+    iv_l = ix_l - np.abs(ixy_l)
+
+    cond = [np.isin(kind, ['I', 'H']), kind == 'tube', kind == 'angle']
+    area = np.select(cond, [a_i, a_o, a_l], np.nan)
+    ix = np.select(cond, [ix_i, i_o, ix_l], np.nan)
+    iy = np.select(cond, [iy_i, i_o, iv_l], np.nan)
+    # 最外纤维距离：角钢绕最小主轴时为肢背角点
+    yx = np.select(cond, [h / 2, h / 2, h - c], np.nan)
+    yy = np.select(cond, [b / 2, h / 2, c * 2 ** 0.5], np.nan)
+    return area / 100, np.sqrt(ix / area) / 10, np.sqrt(iy / area) / 10, ix / yx / 1e3, iy / yy / 1e3
+
+
+@functools.lru_cache(maxsize=None)
+def _read_sections(path):
+    table = pd.read_csv(path)
+    table['A'], table['i_x'], table['i_y'], table['W_x'], table['W_y'] = section_props(
+        table['kind'], table['h'], table['b'], table['tw'], table['tf'])
+    table['t'] = table[['tw', 'tf']].max(axis=1)
+    table['weight'] = table['A'] * 0.785  # kg/m
+    return table.sort_values('weight', kind='stable').set_index('name')
+
+
+def load_sections(path=None):
+    """
+    读取型钢截面库（首次读取后缓存）
+    :param path: 截面尺寸表路径，默认为 section/steel.csv，
+        列为 name, kind, h, b, tw, tf（mm）, shape（P85 页表格列数）
+    :return: DataFrame，以 name 为索引、按 weight 升序排列，增加列 A（cm2）, i_x, i_y（cm）,
+        W_x, W_y（cm3）, t（分类用板厚，mm）, weight（kg/m）
+    """
+    return _read_sections(path or os.path.join(current_path, 'section', 'steel.csv')).copy()
+
+
+def select_sections(sections, l, u, nd, fy=345, fd=305):
+    """
+    为每根杆件选取稳定承载力不小于轴力的最轻截面
+    按计算长度与材料分组，组内对按重量排序的截面承载力取累计最大值后二分查找
+    :param sections: load_sections 返回的截面库，可先按 kind 等筛选
+    :param l: 杆件长度数组（单位：m），长度 m
+    :param u: 计算长度系数，可广播至 (m, 2)
+    :param nd: 轴力设计值数组（单位：kN）
+    :param fy: 屈服强度（单位：MPa）
+    :param fd: 强度设计值（单位：MPa）
+    :return: DataFrame，列为 section（无满足要求的截面时为 nan）, weight, Ncrd, utilization
+    """
+    nd = np.asarray(nd, dtype=float)
+    m = len(nd)
+    l0 = np.asarray(l, dtype=float).reshape(-1, 1) * np.broadcast_to(np.asarray(u, dtype=float), (m, 2))
+    fy, fd = np.broadcast_to(fy, m).astype(float), np.broadcast_to(fd, m).astype(float)
+    groups, inverse = np.unique(np.column_stack([l0, fy, fd]), axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+
+    # 各组计算长度下全部截面的承载力 (n_groups, n_sections)
+    g, s = len(groups), len(sections)
+
+    def tile(col):
+        return np.tile(sections[col].to_numpy(), g)
+
+    _, ncrd = steel_c_batch(
+        1, np.tile(sections[['i_x', 'i_y']].to_numpy(), (g, 1)), np.repeat(groups[:, :2], s, axis=0), tile('t'),
+        tile('shape'), tile('A'), tile('b'), tile('h'), np.repeat(groups[:, 2], s), np.repeat(groups[:, 3], s))
+    ncrd = ncrd.reshape(g, s)
+    cap = np.maximum.accumulate(ncrd, axis=1)
+
+    idx = np.empty(m, dtype=int)
+    for k in range(g):
+        members = np.flatnonzero(inverse == k)
+        idx[members] = np.searchsorted(cap[k], nd[members])
+
+    found = idx < s
+    pick = np.minimum(idx, s - 1)
+    n_res = np.where(found, ncrd[inverse, pick], np.nan)
+    return pd.DataFrame({
+        'section': np.where(found, sections.index.to_numpy()[pick], np.nan),
+        'weight': np.where(found, sections['weight'].to_numpy()[pick], np.nan),
+        'Ncrd': n_res,
+        'utilization': nd / n_res,
+    })
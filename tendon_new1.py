@@ -1,10 +1,5 @@
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-
-import sectionproperties.pre.sections as sections
-from sectionproperties.analysis.cross_section import CrossSection
-from sectionproperties.pre.pre import Material
 
 # 定义一些常数
 a152 = 140  # 15.2预应力束面积（mm）
@@ -58,6 +53,8 @@ class Tendon:
         :param np_test: 预应力值测试值
         :return:
         """
+        import matplotlib.pyplot as plt
+
         fig, ax = plt.subplots(figsize=(8, 8))
         plt.plot(ep_list, np_list[0], label='1')
         plt.plot(ep_list, np_list[1], label='2')
@@ -330,6 +327,9 @@ class Tendon:
             return ep_good[len(ep_good) // 2], ep_good_list[len(ep_good_list) // 2] - self.yu
 
 # 测试
+# import sectionproperties.pre.sections as sections
+# from sectionproperties.analysis.cross_section import CrossSection
+#
 # beam_height = 2.8
 # beam_width = 2.5
 # g = sections.RectangularSection(d=beam_height, b=beam_width)
@@ -3,6 +3,7 @@
 基于《公路桥梁抗风设计规范》（JTG/T 3360-01-2018）前四章进行计算
 """
 
+import functools
 import pandas as pd
 import numpy as np
 import os
@@ -16,11 +17,23 @@ l_z0 = {'A': 0.01, 'B': 0.05, 'C': 0.3, 'D': 1.0}
 l_kc = {'A': 1.174, 'B': 1.0, 'C': 0.785, 'D': 0.564}
 l_kf = [1.05, 1.02, 1.00]
 l_ksf = [[0.88, 0.84, 0.78], [0.92, 0.88, 0.84]]
-l_GV_l = pd.read_csv(current_path + r'\wind\GV_l.csv')
-l_GV_h = pd.read_csv(current_path + r'\wind\GV_h.csv')
-l_CD = pd.read_csv(current_path + r'\wind\CD.csv')
-l_CH = pd.read_csv(current_path + r'\wind\CH.csv')
-l_eta = pd.read_csv(current_path + r'\wind\eta.csv')
+
+
+@functools.lru_cache(maxsize=None)
+def get_table(name):
+    """
+    按需读取 wind 目录下的系数表（首次使用时读取，之后直接返回缓存）
+    :param name: 表名，GV_l, GV_h, CD, CH, eta
+    :return: DataFrame
+    """
+    return pd.read_csv(os.path.join(current_path, 'wind', name + '.csv'))
+
+
+def __getattr__(name):
+    # 兼容原模块级变量 l_GV_l, l_GV_h, l_CD, l_CH, l_eta
+    if name in ('l_GV_l', 'l_GV_h', 'l_CD', 'l_CH', 'l_eta'):
+        return get_table(name[2:])
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 class Wind():
@@ -94,10 +107,10 @@ class BeamWind():
         self.shape = len(shape)
         if wind == 0:
             self.Ud = ud
-            self.GV = np.interp(l, l_GV_l['L'], l_GV_l['A'])
+            self.GV = np.interp(l, get_table('GV_l')['L'], get_table('GV_l')['A'])
         else:
             self.Ud = wind.kf * (z / 10) ** wind.alpha0 * wind.Us10
-            self.GV = np.interp(l, l_GV_l['L'], l_GV_l[wind.surface_class])
+            self.GV = np.interp(l, get_table('GV_l')['L'], get_table('GV_l')[wind.surface_class])
         
         self.Ug = self.GV * self.Ud
 
@@ -131,23 +144,23 @@ class BeamWind():
             shape_l = np.array(shape[4:])
             if shape[0] == 1:
                 # 形状为矩形或 H 形
-                self.CH = np.interp(shape[1], l_CH['R'], l_CH['RorH'])
+                self.CH = np.interp(shape[1], get_table('CH')['R'], get_table('CH')['RorH'])
             elif shape[0] == 2:
                 # 形状为圆形
                 self.CH = []
                 for i in shape_l:
                     du = i * self.Ud
                     if du > 6:
-                        ch = np.interp(shape[1], l_CH['R'], l_CH['du>6'])
+                        ch = np.interp(shape[1], get_table('CH')['R'], get_table('CH')['du>6'])
                         self.CH.append(ch)
                     else:
-                        ch = np.interp(shape[1], l_CH['R'], l_CH['du<6'])
+                        ch = np.interp(shape[1], get_table('CH')['R'], get_table('CH')['du<6'])
                         self.CH.append(ch)
                 self.CH = np.array(self.CH)
             else:
                 self.CH = 0
                 print('请输入桁架形状，矩形或 H 型钢为 1， 圆形为 2')
-            etas = [np.interp(shape[1], l_eta.iloc[0, 1:], l_eta.iloc[i, 1:]) for i in np.arange(1, 7)]
+            etas = [np.interp(shape[1], get_table('eta').iloc[0, 1:], get_table('eta').iloc[i, 1:]) for i in np.arange(1, 7)]
             eta = np.interp(shape[2]/shape[3], np.arange(1, 7), etas)
             self.CH *= eta
             self.Fg = 1/2 * rho * self.Ug ** 2 * self.CH * shape_l
@@ -190,10 +203,10 @@ class PierWind():
         # 是否为直接提供风速值
         if wind == 0:
             self.Ud = ud
-            self.GV = np.interp(shape[0], l_GV_h['H'], l_GV_h['A'])
+            self.GV = np.interp(shape[0], get_table('GV_h')['H'], get_table('GV_h')['A'])
         else:
             self.Ud = wind.kf * (self.z / 10) ** wind.alpha0 * wind.Us10
-            self.GV = np.interp(shape[0], l_GV_h['H'], l_GV_h[wind.surface_class])
+            self.GV = np.interp(shape[0], get_table('GV_h')['H'], get_table('GV_h')[wind.surface_class])
         # 计算静阵风
         self.Ug = self.GV * self.Ud
 
@@ -208,12 +221,12 @@ class PierWind():
         # 获取阻力系数
         if shape[1] <= 8:
             for i in [0, 1]:
-                cds = [np.interp(hw[i], l_CD.iloc[0, 1:], l_CD.iloc[j, 1:]) for j in np.arange(1, 10)]
-                cd = np.interp(t[i]/w[i], l_CD.iloc[1:10, 0], cds)
+                cds = [np.interp(hw[i], get_table('CD').iloc[0, 1:], get_table('CD').iloc[j, 1:]) for j in np.arange(1, 10)]
+                cd = np.interp(t[i]/w[i], get_table('CD').iloc[1:10, 0], cds)
                 self.CD.append(cd)
         else:
             for i in [0, 1]:
-                cd = np.interp(hw[i], l_CD.iloc[0, 1:], l_CD.iloc[shape[1]+1, 1:])
+                cd = np.interp(hw[i], get_table('CD').iloc[0, 1:], get_table('CD').iloc[shape[1]+1, 1:])
                 self.CD.append(cd)
         
         self.CD = np.array(self.CD)